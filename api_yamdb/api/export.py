@@ -0,0 +1,114 @@
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from rest_framework.fields import DateTimeField
+
+from api.renderers import JSONRenderer
+from reviews.models import Comments, GenreTitle, Review, Title
+
+
+def iter_chunks(queryset, chunk_size):
+    """Строки queryset списками по chunk_size, без загрузки всей таблицы."""
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_genres(title_ids):
+    genres = defaultdict(list)
+    for title_id, slug in GenreTitle.objects.filter(
+        title_id__in=title_ids,
+        genre__isnull=False,
+    ).order_by('genre__name', 'genre_id').values_list(
+        'title_id', 'genre__slug',
+    ):
+        genres[title_id].append(slug)
+    return genres
+
+
+def title_rows(queryset, chunk_size):
+    for chunk in iter_chunks(queryset.values(
+        'id', 'name', 'year', 'description', 'category__slug',
+        'rating', 'review_count',
+    ), chunk_size):
+        genres = get_genres([row['id'] for row in chunk])
+        for row in chunk:
+            yield {
+                'id': row['id'],
+                'name': row['name'],
+                'year': row['year'],
+                'description': row['description'],
+                'category': row['category__slug'],
+                'genre': genres[row['id']],
+                'rating': row['rating'],
+                'review_count': row['review_count'],
+            }
+
+
+def review_rows(queryset, chunk_size):
+    pub_date = DateTimeField()
+    for row in queryset.values(
+        'id', 'title_id', 'author__username', 'text', 'score', 'pub_date',
+        'comment_count',
+    ).iterator(chunk_size=chunk_size):
+        yield {
+            'id': row['id'],
+            'title': row['title_id'],
+            'author': row['author__username'],
+            'text': row['text'],
+            'score': row['score'],
+            'pub_date': pub_date.to_representation(row['pub_date']),
+            'comment_count': row['comment_count'],
+        }
+
+
+def comment_rows(queryset, chunk_size):
+    pub_date = DateTimeField()
+    for row in queryset.values(
+        'id', 'review__title_id', 'review_id', 'author__username', 'text',
+        'pub_date',
+    ).iterator(chunk_size=chunk_size):
+        yield {
+            'id': row['id'],
+            'title': row['review__title_id'],
+            'review': row['review_id'],
+            'author': row['author__username'],
+            'text': row['text'],
+            'pub_date': pub_date.to_representation(row['pub_date']),
+        }
+
+
+EXPORTS = {
+    'titles': (Title, title_rows),
+    'reviews': (Review, review_rows),
+    'comments': (Comments, comment_rows),
+}
+
+
+def export_ndjson(resource, since=None, after=None, chunk_size=None):
+    """Строки NDJSON выгрузки resource, порциями по chunk_size объектов.
+
+    Объекты идут по возрастанию id: after продолжает прерванную
+    выгрузку, since отбирает отзывы и комментарии, опубликованные
+    не раньше указанного времени.
+    """
+    model, rows = EXPORTS[resource]
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    queryset = model.objects.order_by('id')
+    if after is not None:
+        queryset = queryset.filter(id__gt=after)
+    if since is not None:
+        queryset = queryset.filter(pub_date__gte=since)
+    render = JSONRenderer().render
+    lines = []
+    for row in rows(queryset, chunk_size):
+        lines.append(render(row))
+        if len(lines) >= chunk_size:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
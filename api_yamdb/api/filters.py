@@ -1,14 +1,43 @@
-from django_filters.rest_framework import CharFilter, FilterSet, NumberFilter
+from django_filters.rest_framework import (CharFilter, FilterSet,
+                                           NumberFilter, OrderingFilter)
 
 from reviews.models import Title
+from reviews.search import search_titles
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """Сортировка произведений с id в конце для стабильной пагинации.
+
+    Направление id совпадает с направлением последнего поля, чтобы
+    сортировку целиком обслуживал индекс (поле, id).
+    """
+
+    def filter(self, qs, value):
+        qs = super().filter(qs, value)
+        if value:
+            ordering = qs.query.order_by
+            tiebreaker = '-id' if ordering[-1].startswith('-') else 'id'
+            qs = qs.order_by(*ordering, tiebreaker)
+        return qs
 
 
 class FilterTitle(FilterSet):
+    search = CharFilter(method='filter_search')
     name = CharFilter(field_name='name', lookup_expr='icontains')
     genre = CharFilter(field_name='genre__slug', lookup_expr='icontains')
     category = CharFilter(field_name='category__slug', lookup_expr='icontains')
     year = NumberFilter(field_name='year')
+    year_min = NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = NumberFilter(field_name='rating', lookup_expr='lte')
+    ordering = TitleOrderingFilter(
+        fields=('rating', 'year', 'review_count', 'name'),
+    )
 
     class Meta:
         model = Title
         fields = '__all__'
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
@@ -1,8 +1,394 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag, urlencode
+from rest_framework import serializers, status
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
 from rest_framework.viewsets import GenericViewSet
 
+from reviews.versions import get_versions
+
+
+class ConditionalListMixin:
+    """ETag, Last-Modified и кеш ответов для list по версиям данных.
+
+    Валидаторы строятся из версий `get_version_keys()`, которые
+    увеличиваются при записи в модели, поэтому на If-None-Match
+    и If-Modified-Since ответ 304 отдаётся без основного запроса
+    и сериализации. Ответы анонимным пользователям кешируются по ETag:
+    после записи версия меняется, и старая запись кеша больше не
+    используется.
+    """
+
+    version_keys = ()
+
+    def get_version_keys(self):
+        return self.version_keys
+
+    def get_conditional_validators(self, request):
+        keys = sorted(self.get_version_keys())
+        versions = get_versions(keys)
+        state = [
+            # Ссылки next и previous в теле ответа абсолютные.
+            request.build_absolute_uri('/'),
+            request.path,
+            urlencode(sorted(request.query_params.lists()), doseq=True),
+            request.accepted_renderer.format,
+        ]
+        last_modified = None
+        for key in keys:
+            version, modified = versions.get(key, (0, None))
+            state.append(
+                f'{key}:{version}:{modified.timestamp() if modified else 0}'
+            )
+            if modified and (
+                last_modified is None or modified > last_modified
+            ):
+                last_modified = modified
+        etag = quote_etag(md5('|'.join(state).encode()).hexdigest())
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+        return etag, last_modified
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_conditional_validators(request)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+        )
+        if response is None:
+            response = self.cached_response(etag, handler, request,
+                                            *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def cached_response(self, etag, handler, request, *args, **kwargs):
+        """Ответ анонимному пользователю из кеша или от handler.
+
+        Кешируются тело и заголовки ответа (Content-Type, Vary, Allow
+        и другие, выставленные view). HTML Browsable API не кешируется:
+        в нём CSRF-токен конкретного запроса.
+        """
+        if (
+            request.user.is_authenticated
+            or request.accepted_renderer.media_type.startswith('text/html')
+        ):
+            return handler(request, *args, **kwargs)
+        cache = caches[settings.RESPONSE_CACHE_ALIAS]
+        cache_key = f'response:{etag}'
+        cached = cache.get(cache_key)
+        if cached is not None:
+            content, headers = cached
+            response = HttpResponse(content)
+            for name, value in headers:
+                response[name] = value
+            return response
+
+        def store(rendered):
+            cache.set(
+                cache_key,
+                (rendered.content, list(rendered.items())),
+                settings.RESPONSE_CACHE_TIMEOUT,
+            )
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            response.add_post_render_callback(store)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs,
+        )
+
+
+class ConditionalListRetrieveMixin(ConditionalListMixin):
+    """ETag и Last-Modified для list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs,
+        )
+
+
+def get_sparse_fields(request):
+    """Поля из ?fields= и ?omit= запроса на чтение.
+
+    Возвращает пару множеств (оставить, убрать); None вместо первого
+    означает «все поля».
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    selected = request.query_params.get('fields')
+    omitted = request.query_params.get('omit')
+    return (
+        {name.strip() for name in selected.split(',')} if selected else None,
+        {name.strip() for name in omitted.split(',')} if omitted else set(),
+    )
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет в ответе только поля из ?fields= и без полей из ?omit=.
+
+    Применяется только к корневому сериализатору ответа на GET-запрос:
+    вложенные сериализаторы и валидация входных данных не меняются.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if isinstance(parent, ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return fields
+        selected, omitted = get_sparse_fields(self.context.get('request'))
+        return type(fields)(
+            (name, field) for name, field in fields.items()
+            if (selected is None or name in selected)
+            and name not in omitted
+        )
+
+
+class SparseFieldsViewMixin:
+    """Урезает queryset под поля ответа из ?fields= и ?omit=.
+
+    Загружаются только колонки выбранных полей (и полей keyset-сортировки),
+    select_related и prefetch_related из `sparse_select_related`
+    и `sparse_prefetch_related` выполняются, только если поле есть
+    в ответе. Колонки `sparse_required_fields` загружаются всегда:
+    например, внешний ключ на родителя, которого связанный менеджер
+    подставляет в каждую строку.
+    """
+
+    sparse_actions = ('list', 'retrieve')
+    sparse_select_related = ()
+    sparse_prefetch_related = ()
+    sparse_required_fields = ()
+
+    def get_queryset(self):
+        return self.sparse_queryset(super().get_queryset())
+
+    def sparse_queryset(self, queryset):
+        """queryset, урезанный под поля ответа.
+
+        Viewset, строящий queryset без super().get_queryset(), например
+        из связанного менеджера, пропускает через этот метод свой.
+        """
+        if self.action not in self.sparse_actions:
+            return queryset
+        selected, omitted = get_sparse_fields(self.request)
+        if selected is None and not omitted:
+            return queryset
+        sources = {
+            field.source for field in self.get_serializer().fields.values()
+        }
+        opts = queryset.model._meta
+        only = {opts.pk.name, *self.sparse_required_fields}
+        only.update(
+            field.lstrip('-') for field in getattr(self, 'keyset_ordering', ())
+        )
+        for model_field in opts.concrete_fields:
+            if model_field.name in sources:
+                only.add(model_field.name)
+        queryset = queryset.select_related(None).prefetch_related(None)
+        select_related = [
+            name for name in self.sparse_select_related if name in sources
+        ]
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        prefetch_related = [
+            name for name in self.sparse_prefetch_related if name in sources
+        ]
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset.only(*only)
+
+
+def get_converter(field):
+    """Функция представления значения колонки для поля сериализатора."""
+    if type(field) is serializers.IntegerField:
+        return int
+    if type(field) is serializers.CharField:
+        return str
+    return field.to_representation
+
+
+def get_plain_sources(serializer):
+    """Колонки вложенного сериализатора, если все его поля — колонки."""
+    opts = serializer.Meta.model._meta
+    names = {field.name for field in opts.concrete_fields}
+    sources = [field.source for field in serializer._readable_fields]
+    if all(source in names for source in sources):
+        return sources
+    return None
+
+
+def column_getter(column, convert=None):
+    def build(row):
+        value = getattr(row, column)
+        if convert is None or value is None:
+            return value
+        return convert(value)
+    return build
+
+
+def nested_getter(serializer, key, columns):
+    """Представление связанного объекта из колонок JOIN, одно на id."""
+    representations = {}
+
+    def build(row):
+        pk = getattr(row, key)
+        if pk is None:
+            return None
+        if pk not in representations:
+            representations[pk] = serializer.to_representation({
+                source: getattr(row, column)
+                for source, column in columns
+            })
+        return representations[pk]
+    return build
+
+
+class PageLoader:
+    """Связанные объекты строк страницы, загружаемые одним запросом."""
+
+    def __init__(self, load):
+        self.load = load
+
+    def bind(self, rows):
+        related = self.load({row.pk for row in rows}) if rows else {}
+
+        def build(row):
+            return related.get(row.pk, [])
+        return build
+
+
+class ValuesListMixin:
+    """list из кортежей values_list вместо экземпляров моделей.
+
+    Для каждого поля сериализатора в запрос добавляются колонки:
+    поле модели, slug или поля связанного объекта через JOIN. Связи
+    «многие ко многим» загружаются одним запросом на страницу
+    и раскладываются по карте. Значения представляются теми же полями
+    DRF, поэтому JSON совпадает с обычной сериализацией. Если у
+    сериализатора есть поле другого вида, используется обычный list.
+    """
+
+    values_list_enabled = True
+
+    def list(self, request, *args, **kwargs):
+        plan = self.get_values_plan() if self.values_list_enabled else None
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        columns = [column for _, step_columns, _ in plan
+                   for column in step_columns]
+        columns += [field.lstrip('-')
+                    for field in getattr(self, 'keyset_ordering', ())]
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.prefetch_related(None).values_list(
+            *dict.fromkeys(columns), named=True,
+        )
+        page = self.paginate_queryset(rows)
+        data = self.represent_rows(plan, rows if page is None else page)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def get_values_plan(self):
+        """Список (имя поля, колонки, построение значения) или None."""
+        serializer = self.get_serializer()
+        opts = serializer.Meta.model._meta
+        plan = []
+        for field in serializer._readable_fields:
+            try:
+                model_field = opts.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            step = self.get_values_step(field, model_field)
+            if step is None:
+                return None
+            plan.append((field.field_name, *step))
+        return plan
+
+    def get_values_step(self, field, model_field):
+        if isinstance(field, ListSerializer):
+            if not model_field.many_to_many:
+                return None
+            return self.get_many_step(field, model_field)
+        if isinstance(field, serializers.BaseSerializer):
+            if not model_field.many_to_one:
+                return None
+            return self.get_nested_step(field)
+        if isinstance(field, serializers.SlugRelatedField):
+            if not model_field.many_to_one:
+                return None
+            column = f'{field.source}__{field.slug_field}'
+            return (column,), column_getter(column)
+        if model_field.is_relation or not model_field.concrete:
+            return None
+        return (field.source,), column_getter(
+            field.source, get_converter(field),
+        )
+
+    def get_nested_step(self, field):
+        sources = get_plain_sources(field)
+        if sources is None:
+            return None
+        key = f'{field.source}_id'
+        columns = [
+            (source, f'{field.source}__{source}') for source in sources
+        ]
+        return (
+            (key, *(column for _, column in columns)),
+            nested_getter(field, key, columns),
+        )
+
+    def get_many_step(self, field, model_field):
+        child = field.child
+        sources = get_plain_sources(child)
+        if sources is None:
+            return None
+        owner = model_field.related_query_name()
+
+        def load(ids):
+            related = {}
+            representations = {}
+            for row in child.Meta.model._default_manager.filter(
+                **{f'{owner}__in': ids},
+            ).values(*sources, values_pk=F('pk'), values_owner=F(owner)):
+                pk = row['values_pk']
+                if pk not in representations:
+                    representations[pk] = child.to_representation(row)
+                related.setdefault(row['values_owner'], []).append(
+                    representations[pk],
+                )
+            return related
+        return ('pk',), PageLoader(load)
+
+    def represent_rows(self, plan, rows):
+        builders = [
+            (name, build.bind(rows) if isinstance(build, PageLoader)
+             else build)
+            for name, _, build in plan
+        ]
+        return [
+            {name: build(row) for name, build in builders}
+            for row in rows
+        ]
+
 
-class ModelMixinSet(CreateModelMixin, ListModelMixin,
+class ModelMixinSet(ConditionalListMixin, CreateModelMixin, ListModelMixin,
                     DestroyModelMixin, GenericViewSet):
     pass
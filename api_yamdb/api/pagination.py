@@ -0,0 +1,261 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import date
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу сортировки (keyset).
+
+    Сортировка берётся из атрибута `keyset_ordering` вьюсета и должна
+    заканчиваться уникальным полем, например ('-pub_date', '-id').
+    Курсор хранит значения этих полей у крайнего объекта страницы,
+    поэтому следующая страница выбирается условием WHERE по индексу,
+    а не пропуском offset строк.
+    """
+
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = api_settings.PAGE_SIZE
+    max_limit = None
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = tuple(view.keyset_ordering)
+        self.limit = self.get_limit(request)
+        position, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self.invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(ordering, position),
+            )
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+
+        has_next = position is not None if reverse else has_more
+        has_previous = has_more if reverse else position is not None
+        self.next_position = self.previous_position = None
+        if results:
+            if has_next:
+                self.next_position = self.get_position(results[-1])
+            if has_previous:
+                self.previous_position = self.get_position(results[0])
+        elif position is not None:
+            if reverse:
+                self.next_position = position
+            else:
+                self.previous_position = position
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict((
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        )))
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        if limit <= 0:
+            return self.default_limit
+        if self.max_limit:
+            return min(limit, self.max_limit)
+        return limit
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    def get_position(self, item):
+        fields = [field.lstrip('-') for field in self.ordering]
+        if isinstance(item, dict):
+            return [item[field] for field in fields]
+        return [getattr(item, field) for field in fields]
+
+    def get_position_filter(self, ordering, position):
+        """Условие «строго после position» для заданной сортировки."""
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def decode_cursor(self, request, model):
+        """Позиция и направление из ?cursor=.
+
+        Значения позиции приводятся к полям сортировки через
+        to_python(), поэтому подделанный курсор даёт 404, а не ошибку
+        в запросе к БД.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position, reverse = payload['p'], bool(payload['r'])
+            if not isinstance(position, list) or (
+                len(position) != len(self.ordering)
+            ):
+                raise ValueError
+            position = [
+                self.to_python(model, field, value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    @staticmethod
+    def to_python(model, field, value):
+        # null в позиции не бывает: поля keyset-сортировки не nullable.
+        if isinstance(value, bool) or not isinstance(
+            value, (str, int, float),
+        ):
+            raise TypeError
+        return model._meta.get_field(field.lstrip('-')).to_python(value)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps(
+            {
+                'p': [
+                    value.isoformat() if isinstance(value, date) else value
+                    for value in position
+                ],
+                'r': int(reverse),
+            },
+            separators=(',', ':'),
+        )
+        encoded = urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+
+class LimitOffsetOrKeysetPagination(LimitOffsetPagination):
+    """LimitOffset по умолчанию, keyset при наличии ?cursor= в запросе.
+
+    Keyset-режим доступен вьюсетам, у которых задан `keyset_ordering`.
+    Курсор всегда идёт в порядке `keyset_ordering`, поэтому вместе
+    с параметрами из `keyset_exclusive_params` вьюсета, меняющими
+    порядок строк (например ?ordering= и ?search= произведений),
+    ?cursor= отклоняется с ответом 400.
+
+    Поле `count` в LimitOffset-режиме считается дешёвым способом:
+    вьюсет может вернуть поддерживаемый счётчик из
+    `get_pagination_count()`, иначе строки считаются не дальше
+    `count_limit`, а если их больше — `count` равен null. Точный
+    COUNT(*) выполняется по запросу с `?count=exact`.
+    """
+
+    keyset_class = KeysetPagination
+    count_query_param = 'count'
+    count_limit = settings.PAGINATION_COUNT_LIMIT
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (
+            self.keyset_class.cursor_query_param in request.query_params
+            and getattr(view, 'keyset_ordering', None)
+        ):
+            self.check_keyset_params(request, view)
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.request = request
+        self.count = self.get_count(queryset, request, view)
+        if (
+            self.count is not None
+            and self.count > self.limit
+            and self.template is not None
+        ):
+            self.display_page_controls = True
+
+        if self.count == 0 or (
+            self.count is not None and self.offset > self.count
+        ):
+            self.has_next = False
+            return []
+        results = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(results) > self.limit
+        return results[:self.limit]
+
+    def check_keyset_params(self, request, view):
+        conflicting = [
+            param for param in getattr(view, 'keyset_exclusive_params', ())
+            if request.query_params.get(param)
+        ]
+        if conflicting:
+            raise serializers.ValidationError({
+                self.keyset_class.cursor_query_param: (
+                    'Курсор нельзя сочетать с параметрами '
+                    f'{", ".join(conflicting)}: используйте limit и offset.'
+                ),
+            })
+
+    def get_count(self, queryset, request=None, view=None):
+        if request is not None and request.query_params.get(
+            self.count_query_param,
+        ) == 'exact':
+            return super().get_count(queryset)
+        get_pagination_count = getattr(view, 'get_pagination_count', None)
+        if get_pagination_count is not None:
+            count = get_pagination_count()
+            if count is not None:
+                return count
+        if self.count_limit is None:
+            return super().get_count(queryset)
+        count = queryset.order_by()[:self.count_limit + 1].count()
+        if count > self.count_limit:
+            return None
+        return count
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        offset = self.offset + self.limit
+        return replace_query_param(url, self.offset_query_param, offset)
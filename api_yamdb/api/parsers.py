@@ -0,0 +1,36 @@
+import io
+import re
+
+from django.conf import settings
+from rest_framework import parsers
+
+from api.renderers import JSONRenderer, orjson
+
+# orjson читает целые длиннее 64 бит как float, такие тела
+# разбирает стандартный json.
+LONG_NUMBER = re.compile(rb'\d{19}')
+
+
+class JSONParser(parsers.JSONParser):
+    """JSONParser DRF, ускоренный через orjson, если он установлен.
+
+    orjson разбирает тело в UTF-8; при другой кодировке, числах
+    из 19 и более цифр или ошибке разбора тело передаётся стандартному
+    парсеру, поэтому результат и текст ошибок не меняются.
+    """
+
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get(
+            'encoding', settings.DEFAULT_CHARSET,
+        )
+        if orjson is None or encoding.lower() not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_NUMBER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
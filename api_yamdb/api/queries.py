@@ -0,0 +1,142 @@
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import got_request_exception
+from django.db import connection
+from django.dispatch import Signal, receiver
+
+logger = logging.getLogger(__name__)
+
+# Отправляется, когда запрос к API превысил бюджет или повторил
+# запрос одной формы больше QUERY_REPEAT_LIMIT раз. sender — класс
+# view, аргументы: request, count, budget и repeated (форма -> число).
+# На сигнал подписывается сборщик метрик.
+query_budget_exceeded = Signal()
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LISTS = re.compile(r'\bIN \((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+# Точки сохранения транзакций повторяются в каждом atomic().
+TRANSACTION_STATEMENTS = ('SAVEPOINT', 'RELEASE', 'ROLLBACK')
+
+
+def query_shape(sql):
+    """Форма SQL запроса без значений.
+
+    Числа и строки заменяются на ?, списки IN любой длины — на
+    IN (...), поэтому запросы, отличающиеся только параметрами,
+    имеют одну форму.
+    """
+    return IN_LISTS.sub('IN (...)', LITERALS.sub('?', sql))
+
+
+class QueryBudgetExceeded(Exception):
+    """Запрос к API выполнил больше SQL запросов, чем разрешено."""
+
+
+class QueryRecorder:
+    """execute_wrapper: число SQL запросов и повторы их форм."""
+
+    def __init__(self):
+        self.count = 0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            self.count += 1
+            self.shapes[query_shape(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def repeated(self, limit):
+        """Формы, встретившиеся больше limit раз: признак N+1."""
+        return {
+            shape: count for shape, count in self.shapes.items()
+            if count > limit
+        }
+
+
+def get_view_class(view):
+    """Класс view по функции из resolver_match, если он есть."""
+    return getattr(view, 'cls', getattr(view, 'view_class', None))
+
+
+def get_query_budget(view, method):
+    """Бюджет запросов view для метода запроса.
+
+    query_budget — число для всех действий или словарь действие ->
+    число; для APIView действием считается метод в нижнем регистре.
+    Если бюджет не объявлен, возвращается None.
+    """
+    budget = getattr(get_view_class(view), 'query_budget', None)
+    if isinstance(budget, dict):
+        method = method.lower()
+        actions = getattr(view, 'actions', None) or {}
+        budget = budget.get(actions.get(method, method))
+    return budget
+
+
+@receiver(got_request_exception)
+def skip_failed_request(sender, request=None, **kwargs):
+    """Запрос, завершившийся исключением, бюджетом не проверяется."""
+    if request is not None:
+        request.query_budget_skipped = True
+
+
+class QueryBudgetMiddleware:
+    """Считает SQL запросы каждого запроса к API и ищет N+1.
+
+    Проверяются только view, объявившие query_budget для действия
+    запроса: админка и прочие view Django не проверяются. Нарушением
+    считается превышение бюджета или запрос одной формы, выполненный
+    больше QUERY_REPEAT_LIMIT раз. Бюджет None отключает обе проверки:
+    так объявляются действия, которые через сигналы моделей обновляют
+    агрегаты по каждой связанной строке, например удаление
+    произведения с отзывами. Что
+    делать при нарушении, задаёт QUERY_BUDGET_MODE: raise — исключение
+    QueryBudgetExceeded (разработка и тесты), log — предупреждение
+    в лог, metric — только сигнал query_budget_exceeded. Сигнал
+    отправляется во всех режимах. Запросы, выполненные при отдаче
+    StreamingHttpResponse, не учитываются. Ответы 5xx и запросы,
+    завершившиеся исключением, не проверяются: их запросы, например
+    при построении отладочной страницы ошибки, ничего не говорят
+    о view, а исключение бюджета заменило бы исходную ошибку.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        if (
+            request.resolver_match is not None
+            and response.status_code < 500
+            and not getattr(request, 'query_budget_skipped', False)
+        ):
+            self.check(request, request.resolver_match.func, recorder)
+        return response
+
+    def check(self, request, view, recorder):
+        budget = get_query_budget(view, request.method)
+        if budget is None:
+            return
+        repeated = recorder.repeated(settings.QUERY_REPEAT_LIMIT)
+        if not repeated and recorder.count <= budget:
+            return
+        view_class = get_view_class(view)
+        query_budget_exceeded.send(
+            sender=view_class, request=request, count=recorder.count,
+            budget=budget, repeated=repeated,
+        )
+        message = (
+            f'{request.method} {request.path}: {recorder.count} SQL '
+            f'запросов, бюджет {budget}'
+        )
+        for shape, count in repeated.items():
+            message += f'\n{count} раз: {shape}'
+        if settings.QUERY_BUDGET_MODE == 'raise':
+            raise QueryBudgetExceeded(message)
+        if settings.QUERY_BUDGET_MODE == 'log':
+            logger.warning(message)
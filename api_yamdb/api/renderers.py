@@ -0,0 +1,49 @@
+from rest_framework import renderers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson else 0
+)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer DRF, ускоренный через orjson, если он установлен.
+
+    Вывод совпадает с DRF побайтно: компактные разделители, UTF-8 без
+    экранирования, \\u2028 и \\u2029 экранируются, даты и прочие
+    нестандартные типы кодируются JSONEncoder DRF. Если orjson не может
+    закодировать данные (например, целое больше 64 бит) или запрошен
+    отступ, используется стандартный json. Отличаются только float
+    вне диапазона [1e-4, 1e16), которые orjson пишет без «+» и нулей
+    в экспоненте, и NaN, который orjson записывает как null; в ответах
+    API таких значений нет.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None
+            or orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028',
+        ).replace(
+            b'\xe2\x80\xa9', b'\\u2029',
+        )
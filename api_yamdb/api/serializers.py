@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from api.mixins import SparseFieldsSerializerMixin
 from reviews.models import Category
 from reviews.models import Comments
 from reviews.models import Genre
@@ -23,7 +24,8 @@ class CategorySerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class TitleReadSerializer(serializers.ModelSerializer):
+class TitleReadSerializer(SparseFieldsSerializerMixin,
+                          serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(
         read_only=True,
@@ -32,9 +34,94 @@ class TitleReadSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'category', 'genre', 'rating', 'name', 'description', 'year',
+        )
+        model = Title
+
+
+def score_percentile(counts, total, percent):
+    """Оценка-перцентиль (nearest-rank) по гистограмме оценок."""
+    if not total:
+        return None
+    rank = max(1, -(-total * percent // 100))
+    seen = 0
+    for score in sorted(counts):
+        seen += counts[score]
+        if seen >= rank:
+            return score
+
+
+class TitleRatingDistributionSerializer(serializers.ModelSerializer):
+    rating = serializers.IntegerField(read_only=True)
+    distribution = serializers.SerializerMethodField()
+    median = serializers.SerializerMethodField()
+    percentiles = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = (
+            'id', 'rating', 'review_count',
+            'distribution', 'median', 'percentiles',
+        )
         model = Title
 
+    def get_counts(self, obj):
+        if not hasattr(obj, '_score_counts'):
+            obj._score_counts = {
+                score: count
+                for score, count in obj.score_counts.filter(
+                    count__gt=0,
+                ).values_list('score', 'count')
+            }
+        return obj._score_counts
+
+    def get_distribution(self, obj):
+        counts = self.get_counts(obj)
+        return {
+            str(score): counts.get(score, 0)
+            for score in range(
+                settings.MIN_SCORE_VALUE,
+                settings.MAX_SCORE_VALUE + 1,
+            )
+        }
+
+    def get_median(self, obj):
+        return score_percentile(self.get_counts(obj), obj.review_count, 50)
+
+    def get_percentiles(self, obj):
+        counts = self.get_counts(obj)
+        return {
+            str(percent): score_percentile(counts, obj.review_count, percent)
+            for percent in settings.RATING_PERCENTILES
+        }
+
+
+class TopTitlesQuerySerializer(serializers.Serializer):
+    """Параметры запроса топа произведений."""
+
+    genre = serializers.SlugRelatedField(
+        queryset=Genre.objects.all(),
+        slug_field='slug',
+        required=False,
+    )
+    category = serializers.SlugRelatedField(
+        queryset=Category.objects.all(),
+        slug_field='slug',
+        required=False,
+    )
+    n = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.LEADERBOARD_MAX_SIZE,
+        default=settings.LEADERBOARD_SIZE,
+    )
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    """Параметры запроса выгрузки NDJSON."""
+
+    since = serializers.DateTimeField(required=False)
+    after = serializers.IntegerField(min_value=0, required=False)
+
 
 class TitleWriteSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
@@ -48,14 +135,33 @@ class TitleWriteSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'category', 'genre', 'name', 'description', 'year')
+        model = Title
+
+    def validate_year(self, value):
+        return validate_title_year(value)
+
+
+class TitleBulkItemSerializer(serializers.ModelSerializer):
+    """Произведение в пакетном создании.
+
+    Slug категории и жанров только проверяются на формат: объекты
+    ищутся сразу для всего пакета, по запросу на модель.
+    """
+
+    category = serializers.SlugField()
+    genre = serializers.ListField(child=serializers.SlugField())
+
+    class Meta:
+        fields = ('id', 'category', 'genre', 'name', 'description', 'year')
         model = Title
 
     def validate_year(self, value):
         return validate_title_year(value)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     title = serializers.SlugRelatedField(
         slug_field='name',
         read_only=True,
@@ -85,11 +191,12 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'title', 'author', 'text', 'score', 'pub_date')
         model = Review
 
 
-class CommentsSerializer(serializers.ModelSerializer):
+class CommentsSerializer(SparseFieldsSerializerMixin,
+                         serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
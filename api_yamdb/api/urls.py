@@ -5,6 +5,7 @@ from user.views import UserViewSet
 
 from .views import CategoryViewSet
 from .views import CommentsViewSet
+from .views import ExportView
 from .views import GenreViewSet
 from .views import ReviewViewSet
 from .views import TitleViewSet
@@ -25,6 +26,11 @@ router_v1.register(
     basename='reviews_comments'
 )
 urlpatterns = [
+    path(
+        'v1/export/<slug:resource>.ndjson',
+        ExportView.as_view(),
+        name='export',
+    ),
     path('v1/', include(urls_auth)),
     path('v1/', include(router_v1.urls))
 ]
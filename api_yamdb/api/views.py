@@ -1,22 +1,34 @@
-from django.db.models import Avg
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets, status
+from rest_framework import filters, serializers, viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from api.export import EXPORTS, export_ndjson
 from api.filters import FilterTitle
-from api.mixins import ModelMixinSet
-from api.permissions import (IsAdminModeratorAuthorOrReadOnly,
+from api.mixins import (ConditionalListRetrieveMixin, ModelMixinSet,
+                        SparseFieldsViewMixin, ValuesListMixin)
+from api.permissions import (IsAdmin, IsAdminModeratorAuthorOrReadOnly,
                              IsAdminUserOrReadOnly,
                              IsAdminModeratorAuthorOrReadOnly,
                              )
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import (IsAuthenticated,
+                                        IsAuthenticatedOrReadOnly)
 
 from .serializers import (CategorySerializer,
-                          CommentsSerializer, GenreSerializer,
-                          ReviewSerializer, TitleReadSerializer,
-                          TitleWriteSerializer,
+                          CommentsSerializer, ExportQuerySerializer,
+                          GenreSerializer,
+                          ReviewSerializer, TitleBulkItemSerializer,
+                          TitleRatingDistributionSerializer,
+                          TitleReadSerializer, TitleWriteSerializer,
+                          TopTitlesQuerySerializer,
                           )
-from reviews.models import Category, Genre, Review, Title
+from reviews.leaderboards import get_top_title_ids
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from reviews.versions import bump_versions
 
 
 class CategoryViewSet(ModelMixinSet):
@@ -27,6 +39,8 @@ class CategoryViewSet(ModelMixinSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    version_keys = ('category',)
+    query_budget = {'list': 5, 'create': 6, 'destroy': 12}
 
 
 class GenreViewSet(ModelMixinSet):
@@ -37,30 +51,208 @@ class GenreViewSet(ModelMixinSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    version_keys = ('genre',)
+    # Удаление жанра удаляет связи с произведениями по одной
+    # (сигналы рейтингов по жанрам).
+    query_budget = {'list': 5, 'create': 6, 'destroy': None}
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(SparseFieldsViewMixin, ConditionalListRetrieveMixin,
+                   ValuesListMixin, viewsets.ModelViewSet):
     """ViewSet для модели Title"""
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score'),
-    ).all()
+    queryset = Title.objects.select_related(
+        'category',
+    ).prefetch_related('genre')
+    sparse_actions = ('list', 'retrieve', 'top')
+    sparse_select_related = ('category',)
+    sparse_prefetch_related = ('genre',)
     permission_classes = (IsAdminUserOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = FilterTitle
+    keyset_ordering = ('name', 'id')
+    keyset_exclusive_params = ('ordering', 'search')
+    version_keys = ('title', 'category', 'genre')
+    # Изменение жанров и удаление произведения обновляют рейтинги
+    # и версии через сигналы на каждую связь и каждый отзыв.
+    query_budget = {
+        'list': 6, 'retrieve': 5, 'top': 7, 'rating_distribution': 4,
+        'create': 20, 'bulk': 12, 'update': None, 'partial_update': None,
+        'destroy': None,
+    }
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'top'):
             return TitleReadSerializer
+        if self.action == 'rating_distribution':
+            return TitleRatingDistributionSerializer
         return TitleWriteSerializer
 
+    @action(detail=True, url_path='rating-distribution')
+    def rating_distribution(self, request, pk=None):
+        title = get_object_or_404(
+            Title.objects.only('id', 'rating', 'review_count'),
+            pk=pk,
+        )
+        serializer = self.get_serializer(title)
+        return Response(serializer.data)
+
+    @action(detail=False)
+    def top(self, request):
+        """Лучшие произведения жанра и/или категории по рейтингу.
 
-class ReviewViewSet(viewsets.ModelViewSet):
+        Читается из TitleLeaderboard: n строк по индексу и n
+        произведений по id, без агрегации отзывов.
+        """
+        return self.conditional_response(self.top_titles, request)
+
+    def top_titles(self, request):
+        params = TopTitlesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        title_ids = get_top_title_ids(**params.validated_data)
+        titles = self.get_queryset().in_bulk(title_ids)
+        serializer = self.get_serializer(
+            [titles[title_id] for title_id in title_ids if title_id in titles],
+            many=True,
+        )
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Пакетное создание произведений из JSON-массива.
+
+        Slug категорий и жанров всего пакета ищутся одним запросом
+        на модель, произведения и их связи с жанрами создаются через
+        bulk_create в одной транзакции. Ответ — список той же длины,
+        что и запрос: созданное произведение или {'errors': ...}.
+        Статус 201, если созданы все, 207 — если часть, 400 — если ни
+        одного.
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise serializers.ValidationError(
+                {'non_field_errors': ['Ожидается непустой список '
+                                      'произведений.']},
+            )
+        if len(items) > settings.TITLE_BULK_MAX_SIZE:
+            raise serializers.ValidationError(
+                {'non_field_errors': [
+                    f'Не больше {settings.TITLE_BULK_MAX_SIZE} '
+                    f'произведений за запрос.'
+                ]},
+            )
+        results = [self.validate_bulk_item(item) for item in items]
+        valid = [data for data in results if 'errors' not in data]
+        self.resolve_bulk_slugs(valid)
+        valid = [data for data in results if 'errors' not in data]
+        if valid:
+            self.bulk_create_titles(valid)
+        if len(valid) == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif valid:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            [
+                data if 'errors' in data else {
+                    field: data[field]
+                    for field in TitleBulkItemSerializer.Meta.fields
+                }
+                for data in results
+            ],
+            status=response_status,
+        )
+
+    def validate_bulk_item(self, item):
+        serializer = TitleBulkItemSerializer(data=item)
+        if not serializer.is_valid():
+            return {'errors': serializer.errors}
+        data = dict(serializer.validated_data)
+        data.setdefault('description', None)
+        data.setdefault('year', None)
+        data['genre'] = list(dict.fromkeys(data['genre']))
+        return data
+
+    def resolve_bulk_slugs(self, results):
+        """Заменяет slug на id, отмечая ошибками неизвестные slug."""
+        category_ids = dict(Category.objects.filter(
+            slug__in={data['category'] for data in results},
+        ).values_list('slug', 'id'))
+        genre_ids = dict(Genre.objects.filter(
+            slug__in={slug for data in results for slug in data['genre']},
+        ).values_list('slug', 'id'))
+        does_not_exist = serializers.SlugRelatedField.default_error_messages[
+            'does_not_exist'
+        ]
+        for data in results:
+            errors = {}
+            if data['category'] not in category_ids:
+                errors['category'] = [does_not_exist.format(
+                    slug_name='slug', value=data['category'],
+                )]
+            unknown = [
+                slug for slug in data['genre'] if slug not in genre_ids
+            ]
+            if unknown:
+                errors['genre'] = [
+                    does_not_exist.format(slug_name='slug', value=slug)
+                    for slug in unknown
+                ]
+            if errors:
+                data.clear()
+                data['errors'] = errors
+                continue
+            data['category_id'] = category_ids[data['category']]
+            data['genre_ids'] = [genre_ids[slug] for slug in data['genre']]
+
+    def bulk_create_titles(self, results):
+        with transaction.atomic():
+            titles = Title.objects.bulk_create(
+                Title(
+                    name=data['name'],
+                    description=data['description'],
+                    year=data['year'],
+                    category_id=data['category_id'],
+                )
+                for data in results
+            )
+            if not connection.features.can_return_rows_from_bulk_insert:
+                # Строки вставлены подряд в транзакции, которая держит
+                # блокировку записи, поэтому последние id — наши.
+                title_ids = list(Title.objects.order_by('-id').values_list(
+                    'id', flat=True,
+                )[:len(titles)])
+                for title, title_id in zip(titles, reversed(title_ids)):
+                    title.pk = title_id
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title_id=title.pk, genre_id=genre_id)
+                for title, data in zip(titles, results)
+                for genre_id in data['genre_ids']
+            )
+            bump_versions('title')
+        for title, data in zip(titles, results):
+            data['id'] = title.pk
+
+
+class ReviewViewSet(SparseFieldsViewMixin, ConditionalListRetrieveMixin,
+                    ValuesListMixin, viewsets.ModelViewSet):
     """ViewSet для модели Review"""
     serializer_class = ReviewSerializer
     permission_classes = (
         IsAuthenticatedOrReadOnly,
         IsAdminModeratorAuthorOrReadOnly,
     )
+    keyset_ordering = ('-pub_date', '-id')
+    sparse_select_related = ('author',)
+    sparse_required_fields = ('title',)
+    # Удаление отзыва удаляет комментарии по одному.
+    query_budget = {
+        'list': 5, 'retrieve': 4, 'create': 21, 'update': 19,
+        'partial_update': 19, 'destroy': None,
+    }
+
+    def get_version_keys(self):
+        return (f'title-{self.kwargs.get("title_id")}', 'user', 'import')
 
     def title_get_or_404(self):
         return get_object_or_404(
@@ -68,8 +260,13 @@ class ReviewViewSet(viewsets.ModelViewSet):
             id=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        title = self.title_get_or_404()
-        return title.reviews.all()
+        self.title = self.title_get_or_404()
+        return self.sparse_queryset(
+            self.title.reviews.select_related('author'),
+        )
+
+    def get_pagination_count(self):
+        return self.title.review_count
 
     def perform_create(self, serializer):
         title = self.title_get_or_404()
@@ -78,11 +275,22 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return Response(status=status.HTTP_201_CREATED)
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(SparseFieldsViewMixin, ConditionalListRetrieveMixin,
+                      ValuesListMixin, viewsets.ModelViewSet):
     """ViewSet для модели Comments"""
     serializer_class = CommentsSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAdminModeratorAuthorOrReadOnly,)
+    keyset_ordering = ('pub_date', 'id')
+    sparse_select_related = ('author',)
+    sparse_required_fields = ('review',)
+    query_budget = {
+        'list': 5, 'retrieve': 5, 'create': 9, 'update': 10,
+        'partial_update': 10, 'destroy': 10,
+    }
+
+    def get_version_keys(self):
+        return (f'review-{self.kwargs.get("review_id")}', 'user', 'import')
 
     def review_get_or_404(self):
         return get_object_or_404(
@@ -96,5 +304,41 @@ class CommentsViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user, review=review)
 
     def get_queryset(self):
-        review = self.review_get_or_404()
-        return review.comments.all()
+        self.review = self.review_get_or_404()
+        return self.sparse_queryset(
+            self.review.comments.select_related('author'),
+        )
+
+    def get_pagination_count(self):
+        return self.review.comment_count
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка произведений, отзывов или комментариев в NDJSON.
+
+    Строки читаются через iterator(chunk_size) и отдаются порциями,
+    поэтому память не зависит от размера таблицы. Параметр after
+    продолжает выгрузку после объекта с этим id, since отбирает
+    отзывы и комментарии, опубликованные не раньше указанного времени.
+    """
+    permission_classes = (IsAuthenticated, IsAdmin)
+    # Строки читаются при отдаче ответа и в бюджет не входят.
+    query_budget = {'get': 2}
+
+    def get(self, request, resource):
+        if resource not in EXPORTS:
+            raise Http404
+        params = ExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        if resource == 'titles' and 'since' in params.validated_data:
+            raise serializers.ValidationError(
+                {'since': ['У произведений нет даты публикации.']},
+            )
+        response = StreamingHttpResponse(
+            export_ndjson(resource, **params.validated_data),
+            content_type='application/x-ndjson',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.ndjson"'
+        )
+        return response
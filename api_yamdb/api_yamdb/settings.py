@@ -37,6 +37,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.queries.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -69,6 +70,17 @@ DATABASES = {
     }
 }
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -111,10 +123,21 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.LimitOffsetOrKeysetPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+PAGINATION_COUNT_LIMIT = 10000
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADERS_TYPES': ('Bearer',),
@@ -127,6 +150,18 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 MIN_SCORE_VALUE = 1
 MAX_SCORE_VALUE = 10
+RATING_PERCENTILES = (25, 50, 75, 90)
+LEADERBOARD_MIN_REVIEWS = 3
+LEADERBOARD_SIZE = 10
+LEADERBOARD_MAX_SIZE = 100
+TITLE_BULK_MAX_SIZE = 5000
+EXPORT_CHUNK_SIZE = 2000
+# Нарушение бюджета SQL запросов или N+1 (api.queries): raise —
+# исключение, log — предупреждение в лог, metric — только сигнал
+# query_budget_exceeded для сборщика метрик.
+QUERY_BUDGET_MODE = 'raise' if DEBUG else 'metric'
+# Запрос одной формы, повторённый больше раз за запрос к API, — N+1.
+QUERY_REPEAT_LIMIT = 3
 CONFIRMATION_CODE = 'abcdefghijklmnopqrstuvwxyz123456789'
 CONFIRMATION_CODE_LENGTH = 20
 LENGTH_USERNAME = 150
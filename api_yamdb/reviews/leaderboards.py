@@ -0,0 +1,113 @@
+from collections import defaultdict
+
+from django.conf import settings
+
+from reviews.models import GenreTitle, Title, TitleLeaderboard
+
+
+def build_entries(title, genre_ids):
+    """Строки рейтинга произведения для всех его срезов."""
+    genres = (None, *dict.fromkeys(genre_ids))
+    categories = (None,)
+    if title['category_id'] is not None:
+        categories = (None, title['category_id'])
+    return [
+        TitleLeaderboard(
+            title_id=title['id'],
+            genre_id=genre_id,
+            category_id=category_id,
+            rating=title['rating'],
+            review_count=title['review_count'],
+        )
+        for genre_id in genres
+        for category_id in categories
+    ]
+
+
+def rebuild_leaderboards(title_ids):
+    """Заново строит рейтинги для произведений title_ids."""
+    title_ids = list(title_ids)
+    TitleLeaderboard.objects.filter(title_id__in=title_ids).delete()
+    titles = list(Title.objects.filter(
+        id__in=title_ids,
+        review_count__gte=settings.LEADERBOARD_MIN_REVIEWS,
+    ).values('id', 'category_id', 'rating', 'review_count'))
+    if not titles:
+        return
+    genres = defaultdict(list)
+    for title_id, genre_id in GenreTitle.objects.filter(
+        title_id__in=[title['id'] for title in titles],
+        genre__isnull=False,
+    ).values_list('title_id', 'genre_id'):
+        genres[title_id].append(genre_id)
+    TitleLeaderboard.objects.bulk_create(
+        entry
+        for title in titles
+        for entry in build_entries(title, genres[title['id']])
+    )
+
+
+def update_leaderboard(title_id, create=True):
+    """Обновляет рейтинг и число отзывов произведения во всех срезах.
+
+    Произведение с числом отзывов меньше LEADERBOARD_MIN_REVIEWS
+    убирается из рейтингов. Новые строки добавляются только при
+    create=True: при удалении отзыва число отзывов не растёт, а строки
+    для удаляемого каскадом произведения создавать нельзя.
+    """
+    title = Title.objects.filter(pk=title_id).values(
+        'rating', 'review_count',
+    ).first()
+    entries = TitleLeaderboard.objects.filter(title_id=title_id)
+    if title is None or (
+        title['review_count'] < settings.LEADERBOARD_MIN_REVIEWS
+    ):
+        entries.delete()
+        return
+    if not entries.update(**title) and create:
+        rebuild_leaderboards([title_id])
+
+
+def add_genre_entries(title_id, genre_ids):
+    """Добавляет произведение в рейтинги новых жанров."""
+    title = Title.objects.filter(
+        pk=title_id,
+        review_count__gte=settings.LEADERBOARD_MIN_REVIEWS,
+    ).values('id', 'category_id', 'rating', 'review_count').first()
+    if title is None:
+        return
+    existing = set(TitleLeaderboard.objects.filter(
+        title_id=title_id,
+        genre_id__in=genre_ids,
+    ).values_list('genre_id', flat=True))
+    TitleLeaderboard.objects.bulk_create(
+        entry
+        for entry in build_entries(title, genre_ids)
+        if entry.genre_id is not None and entry.genre_id not in existing
+    )
+
+
+def remove_genre_entries(title_id, genre_ids=None):
+    """Убирает произведение из рейтингов жанров, по умолчанию из всех."""
+    entries = TitleLeaderboard.objects.filter(
+        title_id=title_id,
+        genre__isnull=False,
+    )
+    if genre_ids is not None:
+        entries = entries.filter(genre_id__in=genre_ids)
+    entries.delete()
+
+
+def get_top_title_ids(genre=None, category=None, n=None):
+    """Id лучших произведений среза по убыванию рейтинга.
+
+    Читает n строк по индексу leaderboard_top_idx.
+    """
+    if n is None:
+        n = settings.LEADERBOARD_SIZE
+    return list(TitleLeaderboard.objects.filter(
+        genre=genre,
+        category=category,
+    ).order_by(
+        '-rating', '-review_count', 'title_id',
+    ).values_list('title_id', flat=True)[:n])
@@ -0,0 +1,105 @@
+import csv
+import gzip
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from reviews.seed import TABLES, format_value, get_fields
+
+
+def export_table(path, model, header, fields, chunk_size, compress):
+    """Выгружает таблицу в path, возвращает число строк.
+
+    Строки читаются итератором по chunk_size и сразу пишутся в файл,
+    так что память не зависит от размера таблицы. Файл пишется
+    во временный и переименовывается в конце: прерванная выгрузка
+    не оставляет обрезанный CSV.
+    """
+    partial = path.with_name(path.name + '.partial')
+    if compress:
+        file = gzip.open(partial, 'wt', encoding='utf8', newline='')
+    else:
+        file = open(partial, 'w', encoding='utf8', newline='',
+                    buffering=1024 * 1024)
+    rows = 0
+    try:
+        with file:
+            writer = csv.writer(file, lineterminator='\n')
+            writer.writerow(header)
+            for row in model.objects.order_by('id').values_list(
+                *fields
+            ).iterator(chunk_size=chunk_size):
+                writer.writerow([format_value(value) for value in row])
+                rows += 1
+        os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return rows
+
+
+def export_table_in_thread(*args):
+    """export_table для потока: соединения потока закрываются в конце."""
+    try:
+        return export_table(*args)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Экспорт данных в csv файлы в формате import_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', required=True,
+            help='Каталог для csv файлов; обязателен, чтобы выгрузка '
+                 'не перезаписала исходные данные в static/data',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Количество строк, читаемых из БД за один раз',
+        )
+        parser.add_argument(
+            '--compress', action='store_true',
+            help='Сжимать файлы gzip (*.csv.gz)',
+        )
+        parser.add_argument(
+            '--jobs', type=int, default=1,
+            help='Количество таблиц, выгружаемых параллельно',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        jobs = options['jobs']
+        if chunk_size < 1 or jobs < 1:
+            raise CommandError(
+                '--chunk-size и --jobs должны быть положительными',
+            )
+        directory = Path(options['path'])
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = '.csv.gz' if options['compress'] else '.csv'
+        tasks = [
+            (directory / f'{name}{suffix}', model, tuple(columns),
+             [field.attname for field in get_fields(model, columns)],
+             chunk_size, options['compress'])
+            for name, model, columns in TABLES
+        ]
+
+        started = time.monotonic()
+        if jobs == 1:
+            counts = [export_table(*task) for task in tasks]
+        else:
+            with ThreadPoolExecutor(jobs) as pool:
+                counts = list(pool.map(
+                    lambda task: export_table_in_thread(*task), tasks,
+                ))
+        for task, count in zip(tasks, counts):
+            self.stdout.write(f'{task[0].name}: {count} строк')
+        self.stdout.write(
+            f'Выгружено строк: {sum(counts)} в {directory}, '
+            f'за {time.monotonic() - started:.1f} с'
+        )
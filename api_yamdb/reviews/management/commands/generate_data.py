@@ -0,0 +1,418 @@
+import csv
+import datetime
+import math
+import os
+import random
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+
+from reviews.management.commands.import_data import (VERSION_KEYS,
+                                                     refresh_aggregates,
+                                                     reset_sequences)
+from reviews.seed import TABLES, format_value, get_fields
+from reviews.versions import bump_versions
+
+FIRST_NAMES = ('Анна', 'Иван', 'Мария', 'Пётр', 'Ольга', 'Сергей', 'Елена')
+LAST_NAMES = ('Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Соколов', 'Лебедев')
+TITLE_WORDS = (
+    ('Тихий', 'Последний', 'Красный', 'Долгий', 'Северный', 'Забытый'),
+    ('дом', 'берег', 'город', 'сад', 'путь', 'ветер', 'остров'),
+)
+REVIEW_TEXTS = (
+    'Смотрится на одном дыхании, рекомендую.',
+    'Сюжет предсказуем, но актёры играют отлично.',
+    'Затянуто, к середине стало скучно.',
+    'Одно из лучших произведений жанра.',
+    'Красиво снято, но финал разочаровал.',
+    'Пересматриваю каждый год.',
+)
+COMMENT_TEXTS = (
+    'Согласен.',
+    'Не соглашусь, мне понравилось.',
+    'Спасибо за отзыв!',
+    'А по-моему, переоценено.',
+)
+TITLE_YEARS = (1900, 2020)
+# Даты отзывов — от PUB_DATE_START в пределах PUB_DATE_SPAN,
+# комментарии пишутся в течение COMMENT_DELAY после отзыва.
+# Даты фиксированы, чтобы результат зависел только от --seed.
+PUB_DATE_START = datetime.datetime(2015, 1, 1, tzinfo=datetime.timezone.utc)
+PUB_DATE_SPAN = datetime.timedelta(days=8 * 365)
+COMMENT_DELAY = datetime.timedelta(days=30)
+
+
+def milliseconds(delta):
+    return int(delta.total_seconds() * 1000)
+
+
+def zipf_counts(total, size, exponent, cap):
+    """Число отзывов на каждый из size рангов по закону Ципфа.
+
+    Ранг r получает долю, пропорциональную 1 / r ** exponent, но
+    не больше cap отзывов: у произведения один отзыв от автора.
+    Остаток от округления и сверх cap отдаётся рангам по порядку.
+    """
+    if total > size * cap:
+        raise CommandError(
+            f'{total} отзывов не помещаются в {size} произведений '
+            f'при {cap} пользователях'
+        )
+    weights = [rank ** -exponent for rank in range(1, size + 1)]
+    scale = total / sum(weights)
+    counts = [min(int(weight * scale), cap) for weight in weights]
+    rest = total - sum(counts)
+    for rank in range(size):
+        if not rest:
+            break
+        extra = min(cap - counts[rank], rest)
+        counts[rank] += extra
+        rest -= extra
+    return counts
+
+
+class Generator:
+    """Строки синтетических таблиц в порядке колонок TABLES.
+
+    У каждой таблицы свой генератор случайных чисел, зависящий
+    только от seed и имени таблицы: при тех же параметрах строки
+    совпадают, а, например, другое число комментариев не меняет
+    отзывы.
+    """
+
+    def __init__(self, seed, users, genres, categories, titles, reviews,
+                 comments, zipf):
+        self.seed = seed
+        self.counts = {
+            'users': users, 'genre': genres, 'category': categories,
+            'titles': titles, 'review': reviews,
+        }
+        self.comments = comments
+        self.zipf = zipf
+
+    def random(self, name):
+        return random.Random(f'{self.seed}-{name}')
+
+    def batches(self, batch_size):
+        """Пары (имя таблицы, строки пакета) в порядке загрузки.
+
+        Пакеты комментариев идут за пакетами их отзывов.
+        """
+        for name, rows in (
+            ('users', self.users()),
+            ('genre', self.dictionary('genre', 'Жанр')),
+            ('category', self.dictionary('category', 'Категория')),
+            ('titles', self.titles()),
+            ('genre_title', self.genre_titles()),
+        ):
+            for batch in self.split(rows, batch_size):
+                yield name, batch
+        comments = []
+        for batch in self.split(self.reviews(comments), batch_size):
+            yield 'review', batch
+            # Комментарии последнего отзыва пакета попадают в список
+            # уже после него, вместе со следующим пакетом.
+            if comments:
+                yield 'comments', comments[:]
+                comments.clear()
+        if comments:
+            yield 'comments', comments
+
+    def split(self, rows, batch_size):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def users(self):
+        rng = self.random('users')
+        for pk in range(1, self.counts['users'] + 1):
+            role = 'user'
+            if pk == 1:
+                role = 'admin'
+            elif pk % 100 == 0:
+                role = 'moderator'
+            yield (
+                pk, f'user{pk}', f'user{pk}@yamdb.fake', role, '',
+                rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+            )
+
+    def dictionary(self, name, label):
+        for pk in range(1, self.counts[name] + 1):
+            yield pk, f'{label} {pk}', f'{name}-{pk}'
+
+    def titles(self):
+        rng = self.random('titles')
+        for pk in range(1, self.counts['titles'] + 1):
+            yield (
+                pk,
+                ' '.join(rng.choice(words) for words in TITLE_WORDS),
+                rng.randint(*TITLE_YEARS),
+                rng.randint(1, self.counts['category']),
+            )
+
+    def genre_titles(self):
+        rng = self.random('genre_title')
+        genres = range(1, self.counts['genre'] + 1)
+        pk = 0
+        for title_id in range(1, self.counts['titles'] + 1):
+            for genre_id in rng.sample(genres, min(rng.randint(1, 3),
+                                                   len(genres))):
+                pk += 1
+                yield pk, title_id, genre_id
+
+    def popularity(self):
+        """Число отзывов по id произведений: ранги Ципфа перемешаны,
+        чтобы популярные произведения не шли подряд.
+        """
+        titles = self.counts['titles']
+        counts = zipf_counts(
+            self.counts['review'], titles, self.zipf, self.counts['users'],
+        )
+        self.random('popularity').shuffle(counts)
+        return counts
+
+    def reviews(self, comments):
+        """Отзывы по произведениям; комментарии к ним дописываются
+        в список comments.
+        """
+        rng = self.random('review')
+        comment_rng = self.random('comments')
+        # Число комментариев — геометрическое со средним self.comments.
+        rate = math.log1p(1 / self.comments) if self.comments else None
+        users = range(1, self.counts['users'] + 1)
+        span = milliseconds(PUB_DATE_SPAN)
+        pk = comment_pk = 0
+        for title_id, count in enumerate(self.popularity(), 1):
+            quality = rng.gauss(6.5, 1.5)
+            for author in rng.sample(users, count):
+                pk += 1
+                pub_date = PUB_DATE_START + datetime.timedelta(
+                    milliseconds=rng.randrange(span),
+                )
+                score = min(max(round(rng.gauss(quality, 1.5)),
+                                settings.MIN_SCORE_VALUE),
+                            settings.MAX_SCORE_VALUE)
+                yield (pk, title_id, rng.choice(REVIEW_TEXTS), author, score,
+                       pub_date)
+                if rate is None:
+                    continue
+                for _ in range(int(comment_rng.expovariate(rate))):
+                    comment_pk += 1
+                    comments.append(self.comment(
+                        comment_rng, comment_pk, pk, pub_date,
+                    ))
+
+    def comment(self, rng, pk, review_id, review_date):
+        delay = datetime.timedelta(
+            milliseconds=rng.randrange(milliseconds(COMMENT_DELAY)),
+        )
+        return (pk, review_id, rng.choice(COMMENT_TEXTS),
+                rng.randint(1, self.counts['users']), review_date + delay)
+
+
+class CsvWriter:
+    """Пишет таблицы в CSV файлы в формате import_data.
+
+    Файлы пишутся во временные и переименовываются в close(), файл
+    создаётся и для пустой таблицы.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = {}
+        for name, _, columns in TABLES:
+            file = open(directory / f'{name}.csv.partial', 'w',
+                        encoding='utf8', newline='', buffering=1024 * 1024)
+            self.files[name] = file, csv.writer(file, lineterminator='\n')
+            self.files[name][1].writerow(columns)
+
+    def write(self, name, columns, model, rows):
+        self.files[name][1].writerows(
+            [format_value(value) for value in row] for row in rows
+        )
+
+    def close(self, completed):
+        for name, (file, _) in self.files.items():
+            file.close()
+            partial = self.directory / f'{name}.csv.partial'
+            if completed:
+                os.replace(partial, self.directory / f'{name}.csv')
+            else:
+                partial.unlink(missing_ok=True)
+
+
+class DatabaseWriter:
+    """Вставляет строки в таблицы одним executemany на пакет.
+
+    ORM не создаёт объекты моделей на каждую строку: значения
+    колонок CSV приводятся к значениям БД только для дат, а поля,
+    которых нет в CSV, получают значения по умолчанию, вычисленные
+    один раз на таблицу.
+    """
+
+    def __init__(self):
+        self.statements = {}
+
+    def prepare(self, columns, model):
+        fields = get_fields(model, columns)
+        extra = [
+            field for field in model._meta.concrete_fields
+            if field not in fields
+        ]
+        names = ', '.join(
+            connection.ops.quote_name(field.column)
+            for field in fields + extra
+        )
+        placeholders = ', '.join(['%s'] * (len(fields) + len(extra)))
+        sql = (
+            f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} '
+            f'({names}) VALUES ({placeholders})'
+        )
+        dates = [
+            index for index, field in enumerate(fields)
+            if isinstance(field, models.DateTimeField)
+        ]
+        defaults = tuple(
+            field.get_db_prep_save(field.get_default(), connection)
+            for field in extra
+        )
+        return sql, dates, defaults
+
+    def write(self, name, columns, model, rows):
+        if name not in self.statements:
+            self.statements[name] = self.prepare(columns, model)
+        sql, dates, defaults = self.statements[name]
+        if dates:
+            # Даты генератора в UTC, а с USE_TZ Django хранит их
+            # в UTC без зоны: отбросить зону дешевле, чем
+            # get_db_prep_save и перевод в зону соединения.
+            adapt = connection.ops.adapt_datetimefield_value
+            rows = [list(row) for row in rows]
+            for row in rows:
+                for index in dates:
+                    row[index] = adapt(row[index].replace(tzinfo=None))
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [(*row, *defaults) for row in rows])
+
+    def close(self, completed):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерация синтетических данных: пользователи, произведения, '
+        'отзывы по закону Ципфа и комментарии'
+    )
+
+    def add_arguments(self, parser):
+        for name, default, help_text in (
+            ('--users', 1000, 'Количество пользователей'),
+            ('--titles', 1000, 'Количество произведений'),
+            ('--genres', 20, 'Количество жанров'),
+            ('--categories', 5, 'Количество категорий'),
+            ('--reviews', 10000, 'Количество отзывов'),
+        ):
+            parser.add_argument(name, type=int, default=default,
+                                help=help_text)
+        parser.add_argument(
+            '--comments', type=float, default=0.5,
+            help='Среднее количество комментариев на отзыв',
+        )
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель закона Ципфа для числа отзывов на '
+                 'произведение',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковое зерно даёт одинаковые данные',
+        )
+        parser.add_argument(
+            '--output', choices=('db', 'csv'), default='db',
+            help='db вставляет строки в пустую БД, csv пишет файлы '
+                 'для import_data',
+        )
+        parser.add_argument('--path', help='Каталог для csv файлов')
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Количество строк в одной вставке',
+        )
+
+    def handle(self, *args, **options):
+        self.check_options(options)
+        generator = Generator(
+            options['seed'], options['users'], options['genres'],
+            options['categories'], options['titles'], options['reviews'],
+            options['comments'], options['zipf'],
+        )
+        started = time.monotonic()
+        if options['output'] == 'csv':
+            directory = Path(options['path'])
+            directory.mkdir(parents=True, exist_ok=True)
+            counts = self.write(
+                CsvWriter(directory), generator, options['batch_size'],
+            )
+            target = directory
+        else:
+            with transaction.atomic():
+                counts = self.write(
+                    DatabaseWriter(), generator, options['batch_size'],
+                )
+                self.refresh(options['batch_size'])
+            target = connection.settings_dict['NAME']
+        for name, count in counts.items():
+            self.stdout.write(f'{name}: {count} строк')
+        self.stdout.write(
+            f'Сгенерировано строк: {sum(counts.values())} в {target}, '
+            f'за {time.monotonic() - started:.1f} с'
+        )
+
+    def check_options(self, options):
+        if any(options[name] < 1 for name in (
+            'users', 'genres', 'categories', 'titles', 'batch_size',
+        )) or options['reviews'] < 0 or options['comments'] < 0:
+            raise CommandError(
+                'Количества должны быть положительными, отзывы '
+                'и комментарии — неотрицательными',
+            )
+        if options['output'] == 'csv' and not options['path']:
+            raise CommandError('Для --output csv нужен --path')
+        if options['output'] == 'db':
+            for name, model, _ in TABLES:
+                if model.objects.exists():
+                    raise CommandError(
+                        f'В таблице {name} уже есть данные: generate_data '
+                        'заполняет только пустую БД',
+                    )
+
+    def write(self, writer, generator, batch_size):
+        tables = {name: (columns, model) for name, model, columns in TABLES}
+        counts = dict.fromkeys(tables, 0)
+        completed = False
+        try:
+            for name, rows in generator.batches(batch_size):
+                writer.write(name, *tables[name], rows)
+                counts[name] += len(rows)
+            completed = True
+        finally:
+            writer.close(completed)
+        return counts
+
+    def refresh(self, batch_size):
+        """Последовательности, агрегаты и версии после вставки мимо ORM."""
+        for _, model, _ in TABLES:
+            reset_sequences(model)
+        # recompute_chunk перестраивает рейтинги по жанрам для всех
+        # произведений с отзывами: у остальных позиций в рейтинге нет.
+        refresh_aggregates(batch_size, False)
+        bump_versions(*dict.fromkeys(
+            key for keys in VERSION_KEYS.values() for key in keys
+        ))
@@ -1,121 +1,510 @@
-from csv import DictReader
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from csv import reader as csv_reader
+from pathlib import Path
 
-from django.core.management.base import BaseCommand
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max, Min
 
 from api_yamdb.settings import BASE_DIR
-from reviews.models import Category, Comments, Genre, GenreTitle, Review, Title
-from user.models import User
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.management.commands.recompute_ratings import recompute_chunk
+from reviews.models import Comments, GenreTitle, Review, Title
+from reviews.seed import TABLES, get_fields
+from reviews.seed_checks import check_seed
+from reviews.versions import bump_versions
+
+# Наборы данных, версии которых меняются при загрузке модели.
+# Списки отзывов и комментариев зависят от версии 'user' и от версии
+# 'import': вместо версий title-<id> и review-<id> каждого
+# затронутого объекта загрузка увеличивает одну общую версию.
+VERSION_KEYS = {
+    'users': ('user',),
+    'genre': ('genre',),
+    'category': ('category',),
+    'titles': ('title', 'import'),
+    'genre_title': ('title',),
+    'review': ('title', 'user', 'import'),
+    'comments': ('user', 'import'),
+}
+AGGREGATE_MODELS = (Title, GenreTitle, Review, Comments)
+# Как часто, в секундах, печатается ход загрузки таблицы.
+PROGRESS_INTERVAL = 5
+
+
+def to_python(field, value):
+    """Значение колонки CSV, приведённое к типу поля модели."""
+    if value == '' and field.null:
+        return None
+    return field.to_python(value)
+
+
+class RowConverter:
+    """Приводит записи CSV файла таблицы к значениям полей модели."""
+
+    def __init__(self, name, header):
+        self.name = name
+        _, self.model, columns = next(
+            table for table in TABLES if table[0] == name
+        )
+        missing = set(columns) - set(header)
+        if missing:
+            raise CommandError(
+                f'{name}.csv: нет колонок {", ".join(sorted(missing))}'
+            )
+        self.fields = [
+            (header.index(column), column, field)
+            for column, field in zip(columns, get_fields(self.model, columns))
+        ]
+
+    def error(self, line, message):
+        return CommandError(f'{self.name}.csv, строка {line}: {message}')
+
+    def convert(self, row, line):
+        values = {}
+        for index, column, field in self.fields:
+            try:
+                values[field.attname] = to_python(field, row[index])
+            except ValidationError as error:
+                raise self.error(line, f'{column}: {" ".join(error.messages)}')
+            except IndexError:
+                raise self.error(line, f'нет значения {column}')
+        return values
+
+
+class ForeignKeyChecker:
+    """Проверяет внешние ключи строк по множествам id, загруженным
+    один раз для каждой связанной модели, без запросов на строку.
+    """
+
+    def __init__(self, converter):
+        self.converter = converter
+        self.references = [
+            (column, field.attname, field.related_model, set(
+                field.related_model.objects.values_list('pk', flat=True)
+            ))
+            for _, column, field in converter.fields
+            if field.is_relation
+        ]
+
+    def check(self, line, values):
+        for column, attname, model, ids in self.references:
+            value = values[attname]
+            if value is not None and value not in ids:
+                raise self.converter.error(
+                    line, f'{column}: {model.__name__} с id {value} '
+                          'не существует',
+                )
+        return values
+
+
+def parse_batch(name, header, records, line):
+    """Разбирает записи пакета в пары (строка файла, значения полей).
+
+    Выполняется в процессах пула: разбор CSV и приведение типов
+    занимают основное время процессора при загрузке.
+    """
+    converter = RowConverter(name, header)
+    rows = []
+    for record in records:
+        row = next(
+            csv_reader(io.StringIO(record.decode('utf8'), newline='')), None,
+        )
+        if row:
+            rows.append((line, converter.convert(row, line)))
+        line += record.count(b'\n')
+    return rows
+
+
+def read_header(path):
+    """Колонки CSV файла и смещение первой записи после заголовка."""
+    with open(path, 'rb') as file:
+        line = file.readline()
+    return next(csv_reader([line.decode('utf-8-sig')]), []), len(line)
+
+
+def read_batches(path, offset, line, batch_size):
+    """Пакеты записей файла начиная с байта offset.
+
+    Запись может занимать несколько строк файла: она заканчивается
+    на строке, после которой число кавычек в записи чётно. Для пакета
+    возвращаются записи, строка файла первой записи, смещение и номер
+    строки после пакета — с них загрузка продолжается после сбоя.
+    """
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        batch, first = [], line
+        record, quotes = b'', 0
+        for chunk in file:
+            offset += len(chunk)
+            record += chunk
+            quotes += chunk.count(b'"')
+            if quotes % 2:
+                continue
+            batch.append(record)
+            line += record.count(b'\n')
+            record, quotes = b'', 0
+            if len(batch) >= batch_size:
+                yield batch, first, offset, line
+                batch, first = [], line
+        if record:
+            batch.append(record)
+        if batch:
+            yield batch, first, offset, line
+
+
+def parse_batches(pool, jobs, name, header, batches):
+    """Разобранные пакеты с положением в файле, в порядке файла.
+
+    С пулом процессов в работе держится не больше 2 * jobs пакетов:
+    очередь ограничена, и чтение файла не обгоняет запись в БД.
+    """
+    if pool is None:
+        for records, line, offset, end_line in batches:
+            yield parse_batch(name, header, records, line), offset, end_line
+        return
+    pending = deque()
+    for records, line, offset, end_line in batches:
+        pending.append((
+            pool.submit(parse_batch, name, header, records, line),
+            offset, end_line,
+        ))
+        if len(pending) >= 2 * jobs:
+            future, offset, end_line = pending.popleft()
+            yield future.result(), offset, end_line
+    while pending:
+        future, offset, end_line = pending.popleft()
+        yield future.result(), offset, end_line
+
+
+def skip_existing(model, objects):
+    """Объекты, которых ещё нет в таблице."""
+    existing = set(model.objects.filter(
+        pk__in=[obj.pk for obj in objects],
+    ).values_list('pk', flat=True))
+    return [obj for obj in objects if obj.pk not in existing]
+
+
+def reset_sequences(model):
+    """Сдвигает последовательность id после вставки явных id."""
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def upsert(model, objects, attnames):
+    """Добавляет новые объекты и обновляет изменившиеся.
+
+    Существующие строки пакета читаются одним запросом по id, новые
+    вставляются bulk_create, а bulk_update получает только строки
+    с изменившимися значениями и только изменившиеся поля из attnames:
+    поля, которых нет в CSV, например пароль, не трогаются.
+    Возвращает добавленные объекты, изменённые объекты и их прежние
+    версии.
+    """
+    existing = {
+        row[0]: row[1:]
+        for row in model.objects.filter(
+            pk__in=[obj.pk for obj in objects],
+        ).values_list('pk', *attnames)
+    }
+    created = [obj for obj in objects if obj.pk not in existing]
+    changed, previous, fields = [], [], set()
+    for obj in objects:
+        if obj.pk not in existing:
+            continue
+        old = dict(zip(attnames, existing[obj.pk]))
+        diff = {name for name in attnames if getattr(obj, name) != old[name]}
+        if diff:
+            changed.append(obj)
+            previous.append(model(pk=obj.pk, **old))
+            fields |= diff
+    model.objects.bulk_create(created)
+    if changed:
+        model.objects.bulk_update(changed, sorted(fields))
+    return created, changed, previous
+
+
+def get_title_ids(model, objects):
+    """id произведений, агрегаты которых зависят от объектов."""
+    if model is Title:
+        return {obj.pk for obj in objects}
+    if model in (GenreTitle, Review):
+        return {obj.title_id for obj in objects}
+    if model is Comments and objects:
+        return set(Review.objects.filter(
+            pk__in={obj.review_id for obj in objects},
+        ).values_list('title_id', flat=True))
+    return set()
+
+
+def refresh_aggregates(chunk_size, rebuild_genres, title_ids=None):
+    """Пересчитывает рейтинги и счётчики после массовой загрузки.
+
+    bulk_create и bulk_update не вызывают сигналы, поэтому агрегаты
+    произведений и отзывов пересчитываются так же, как
+    в recompute_ratings: по диапазонам id, в которые попадают
+    title_ids, или по всем произведениям. Рейтинги по жанрам
+    и категориям перестраиваются, если менялись произведения
+    или их жанры.
+    """
+    if title_ids is None:
+        bounds = Title.objects.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            return
+        starts = range(bounds['first'], bounds['last'] + 1, chunk_size)
+    else:
+        starts = sorted({
+            title_id // chunk_size * chunk_size for title_id in title_ids
+        })
+    for start in starts:
+        recompute_chunk(start, start + chunk_size)
+        if rebuild_genres:
+            rebuild_leaderboards(Title.objects.filter(
+                id__gte=start, id__lt=start + chunk_size,
+            ).values_list('id', flat=True))
+
+
+class Checkpoint:
+    """Состояние загрузки файлов: смещение, номер строки и число
+    загруженных строк после последнего записанного пакета.
+
+    Без пути к файлу состояние хранится только в памяти.
+    """
+
+    def __init__(self, path):
+        self.path = path and Path(path)
+        self.tables = {}
+        if self.path and self.path.exists():
+            self.tables = json.loads(self.path.read_text())
+
+    def __bool__(self):
+        return bool(self.path)
+
+    def save(self, name, **state):
+        self.tables[name] = state
+        if not self.path:
+            return
+        partial = self.path.with_name(self.path.name + '.partial')
+        partial.write_text(json.dumps(self.tables))
+        os.replace(partial, self.path)
+
+    def finish(self, name):
+        self.save(name, **{**self.tables[name], 'done': True})
+
+    def delete(self):
+        if self.path:
+            self.path.unlink(missing_ok=True)
+
+
+class Progress:
+    """Печатает ход загрузки таблицы не чаще PROGRESS_INTERVAL секунд."""
+
+    def __init__(self, stdout, name, size):
+        self.stdout = stdout
+        self.name = name
+        self.size = max(size, 1)
+        self.started = self.reported = time.monotonic()
+
+    def update(self, offset, rows, force=False):
+        now = time.monotonic()
+        if not force and now - self.reported < PROGRESS_INTERVAL:
+            return
+        self.reported = now
+        elapsed = max(now - self.started, 1e-6)
+        self.stdout.write(
+            f'{self.name}: {offset * 100 // self.size}%, {rows} строк, '
+            f'{rows / elapsed:.0f} строк/с'
+        )
 
 
 class Command(BaseCommand):
     help = 'Импорт данных из csv файлов'
 
-    def ImportUser(self):
-        if User.objects.exists():
-            print('Данные для User уже загружены')
-        else:
-            for row in DictReader(open(
-                    BASE_DIR / 'static/data/users.csv',
-                    encoding='utf8')):
-                User.objects.create(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    role=row['role'],
-                    bio=row['bio'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name'])
-            print('Данные для User загружены')
-
-    def ImportGenre(self):
-        if Genre.objects.exists():
-            print('Данные для Genre уже загружены')
-        else:
-            for row in DictReader(open(
-                    BASE_DIR / 'static/data/genre.csv',
-                    encoding='utf8')):
-                Genre.objects.create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug'])
-            print('Данные для genre загружены')
-
-    def ImportCategory(self):
-        if Category.objects.exists():
-            print('Данные для Category уже загружены')
-        else:
-            for row in DictReader(open(
-                    BASE_DIR / 'static/data/category.csv',
-                    encoding='utf8')):
-                Category.objects.create(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug'])
-            print('Данные для Category загружены')
-
-    def ImportTitle(self):
-        if Title.objects.exists():
-            print('Данные для Title уже загружены')
-        else:
-            for row in DictReader(open(
-                    BASE_DIR / 'static/data/titles.csv',
-                    encoding='utf8')):
-                Title.objects.create(
-                    id=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category=Category.objects.get(id=row['category']))
-            print('Данные для Title загружены')
-
-    def ImportGenreTitle(self):
-        if GenreTitle.objects.exists():
-            print('Данные для GenreTitle уже загружены')
-        else:
-            for row in DictReader(open(
-                    BASE_DIR / 'static/data/genre_title.csv',
-                    encoding='utf8')):
-                GenreTitle.objects.create(
-                    id=row['id'],
-                    title_id=row['title_id'],
-                    genre_id=row['genre_id'])
-            print('Данные для GenreTitle загружены')
-
-    def ImportReview(self):
-        if Review.objects.exists():
-            print('Данные для Review уже загружены')
-        else:
-            for row in DictReader(open(
-                    BASE_DIR / 'static/data/review.csv',
-                    encoding='utf8')):
-                Review.objects.create(
-                    id=row['id'],
-                    title_id=row['title_id'],
-                    text=row['text'],
-                    author=User.objects.get(id=row['author']),
-                    score=row['score'],
-                    pub_date=row['pub_date'])
-            print('Данные для Review загружены')
-
-    def ImportComments(self):
-        if Comments.objects.exists():
-            print('Данные для Comments уже загружены')
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=BASE_DIR / 'static/data',
+            help='Каталог с csv файлами',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одном bulk_create',
+        )
+        parser.add_argument(
+            '--jobs', type=int, default=1,
+            help='Количество процессов для разбора csv',
+        )
+        parser.add_argument(
+            '--mode', choices=('insert', 'upsert'), default='insert',
+            help='insert загружает только пустые таблицы, upsert '
+                 'добавляет новые id и обновляет изменившиеся строки',
+        )
+        parser.add_argument(
+            '--validate-only', action='store_true',
+            help='Только проверить файлы: типы, диапазоны, уникальность '
+                 'и внешние ключи, ничего не загружая',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл состояния загрузки: каждый пакет сохраняется '
+                 'сразу, прерванная загрузка продолжается с места сбоя',
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.jobs = options['jobs']
+        if self.batch_size < 1 or self.jobs < 1:
+            raise CommandError(
+                '--batch-size и --jobs должны быть положительными',
+            )
+        self.directory = Path(options['path'])
+        if options['validate_only']:
+            return self.validate()
+        self.verbosity = options['verbosity']
+        self.mode = options['mode']
+        self.checkpoint = Checkpoint(options['checkpoint'])
+        # После продолжения прерванной загрузки неизвестно, какие
+        # произведения затронул прошлый запуск: агрегаты
+        # пересчитываются для всех.
+        self.title_ids = None if self.checkpoint.tables else set()
+        self.pool = None
+        if self.jobs > 1:
+            # Воркеры только разбирают CSV и не обращаются к БД:
+            # унаследованные соединения в них не используются
+            # и не закрываются, поэтому пул можно запускать и внутри
+            # транзакции загрузки таблицы.
+            self.pool = ProcessPoolExecutor(self.jobs)
+        try:
+            loaded = [
+                (name, model) for name, model, _ in TABLES
+                if self.import_table(name, model)
+            ]
+        finally:
+            if self.pool:
+                self.pool.shutdown(cancel_futures=True)
+        if loaded:
+            self.refresh(loaded)
+        self.checkpoint.delete()
+
+    def validate(self):
+        started = time.monotonic()
+        rows, report = check_seed(self.directory)
+        for line in report:
+            self.stdout.write(line)
+        elapsed = time.monotonic() - started
+        if report:
+            raise CommandError(
+                f'Найдено ошибок: {len(report)} в {rows} строках '
+                f'за {elapsed:.1f} с'
+            )
+        self.stdout.write(f'Проверено строк: {rows}, ошибок нет, '
+                          f'за {elapsed:.1f} с')
+
+    def refresh(self, loaded):
+        models = {model for _, model in loaded}
+        if models & set(AGGREGATE_MODELS):
+            refresh_aggregates(
+                self.batch_size, bool(models & {Title, GenreTitle}),
+                self.title_ids,
+            )
+        bump_versions(*dict.fromkeys(
+            key for name, _ in loaded for key in VERSION_KEYS[name]
+        ))
+
+    def import_table(self, name, model):
+        """Загружает таблицу, если она пуста или загружена не до конца.
+
+        В режиме upsert загружаются и непустые таблицы. Возвращает
+        True, если строки таблицы менялись в этом или в прерванном
+        запуске.
+        """
+        state = self.checkpoint.tables.get(name)
+        if state and state['done']:
+            self.stdout.write(f'Данные для {name} уже загружены')
+            return True
+        if not state and self.mode == 'insert' and model.objects.exists():
+            self.stdout.write(f'Данные для {name} уже загружены')
+            return False
+        if not (self.directory / f'{name}.csv').exists():
+            self.stdout.write(f'Файла {name}.csv нет, таблица пропущена')
+            return False
+        started = time.monotonic()
+        self.created = self.updated = 0
+        # Без файла состояния таблица загружается в одной транзакции:
+        # после сбоя она остаётся прежней и загружается заново.
+        with nullcontext() if self.checkpoint else transaction.atomic():
+            count = self.load_rows(name, model, state)
+            reset_sequences(model)
+        self.checkpoint.finish(name)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        changes = ''
+        if self.mode == 'upsert':
+            changes = f' (новых {self.created}, изменено {self.updated})'
+        self.stdout.write(
+            f'Данные для {name} загружены: {count} строк{changes} '
+            f'за {elapsed:.1f} с, {count / elapsed:.0f} строк/с'
+        )
+        return bool(state or self.created or self.updated)
+
+    def load_rows(self, name, model, state):
+        """Пишет в БД пакеты файла и сохраняет положение после каждого.
+
+        Возвращает число строк таблицы, загруженных с начала файла.
+        """
+        path = self.directory / f'{name}.csv'
+        header, offset = read_header(path)
+        converter = RowConverter(name, header)
+        checker = ForeignKeyChecker(converter)
+        attnames = [
+            field.attname for _, _, field in converter.fields
+            if not field.primary_key
+        ]
+        resumed = state is not None
+        if not resumed:
+            state = {'offset': offset, 'line': 2, 'rows': 0, 'done': False}
+            self.checkpoint.save(name, **state)
+        progress = Progress(self.stdout, name, path.stat().st_size)
+        rows = state['rows']
+        for parsed, offset, line in parse_batches(
+            self.pool, self.jobs, name, header, read_batches(
+                path, state['offset'], state['line'], self.batch_size,
+            ),
+        ):
+            objects = [
+                model(**checker.check(*row)) for row in parsed
+            ]
+            if resumed and self.mode == 'insert':
+                # Пакеты могли быть записаны до сбоя, а состояние — нет.
+                count = len(objects)
+                objects = skip_existing(model, objects)
+                resumed = len(objects) < count
+            with transaction.atomic():
+                self.write_batch(model, objects, attnames)
+            rows += len(objects)
+            self.checkpoint.save(
+                name, offset=offset, line=line, rows=rows, done=False,
+            )
+            progress.update(offset, rows, self.verbosity > 1)
+        return rows
+
+    def write_batch(self, model, objects, attnames):
+        if self.mode == 'upsert':
+            created, changed, previous = upsert(model, objects, attnames)
         else:
-            for row in DictReader(open(
-                    BASE_DIR / 'static/data/comments.csv',
-                    encoding='utf8')):
-                Comments.objects.create(
-                    id=row['id'],
-                    review_id=row['review_id'],
-                    text=row['text'],
-                    author=User.objects.get(id=row['author']),
-                    pub_date=row['pub_date'])
-            print('Данные для Comments загружены')
-
-    def handle(self, *args, **kwargs):
-        self.ImportUser()
-        self.ImportGenre()
-        self.ImportCategory()
-        self.ImportTitle()
-        self.ImportGenreTitle()
-        self.ImportReview()
-        self.ImportComments()
+            model.objects.bulk_create(objects)
+            created, changed, previous = objects, [], []
+        self.created += len(created)
+        self.updated += len(changed)
+        if self.title_ids is not None:
+            self.title_ids |= get_title_ids(
+                model, [*created, *changed, *previous],
+            )
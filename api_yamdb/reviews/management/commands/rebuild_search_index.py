@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.search import rebuild_search_index
+from reviews.versions import bump_versions
+
+
+class Command(BaseCommand):
+    help = 'Пересоздание полнотекстового индекса произведений (SQLite FTS5)'
+
+    def handle(self, *args, **options):
+        if not rebuild_search_index():
+            raise CommandError(
+                'FTS5 недоступен, поиск работает без полнотекстового индекса'
+            )
+        # Результаты ?search= могли измениться: кеш и ETag списка
+        # произведений сбрасываются.
+        bump_versions('title')
+        self.stdout.write('Полнотекстовый индекс произведений пересоздан')
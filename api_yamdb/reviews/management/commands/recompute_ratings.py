@@ -0,0 +1,236 @@
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Comments, Review, Title, TitleScoreCount
+from reviews.versions import bump_versions
+
+
+def init_worker():
+    """Готовит процесс-воркер: Django и собственные соединения с БД."""
+    django.setup()
+    connections.close_all()
+
+
+@transaction.atomic
+def recompute_chunk(start, stop, dry_run=False):
+    """Пересчитывает агрегаты произведений с id в [start, stop).
+
+    Оценки читаются одним GROUP BY (title_id, score), из гистограммы
+    получаются сумма и количество. Счётчики комментариев отзывов
+    исправляются одним UPDATE, рейтинги разошедшихся произведений
+    перестраиваются. Чтение и запись идут в одной транзакции, иначе
+    отзыв, добавленный между ними, затирался бы. Возвращает число
+    произведений в диапазоне, число разошедшихся с отзывами и число
+    отзывов с неверным счётчиком комментариев.
+    """
+    # Строки произведений блокируются до чтения отзывов: отзыв,
+    # добавленный параллельно, ждёт конца пересчёта и увеличивает уже
+    # исправленные счётчики через F().
+    titles = list(Title.objects.filter(
+        id__gte=start,
+        id__lt=stop,
+    ).select_for_update().values_list(
+        'id', 'score_sum', 'review_count', 'rating',
+    ))
+    histograms = defaultdict(dict)
+    for title_id, score, count in Review.objects.filter(
+        title_id__gte=start,
+        title_id__lt=stop,
+    ).values_list('title_id', 'score').annotate(
+        count=Count('id'),
+    ).order_by():
+        histograms[title_id][score] = count
+
+    stored_histograms = defaultdict(dict)
+    for title_id, score, count in TitleScoreCount.objects.filter(
+        title_id__gte=start,
+        title_id__lt=stop,
+        count__gt=0,
+    ).values_list('title_id', 'score', 'count'):
+        stored_histograms[title_id][score] = count
+
+    checked = 0
+    drifted = []
+    for title_id, score_sum, review_count, rating in titles:
+        checked += 1
+        histogram = histograms.get(title_id, {})
+        expected_sum = sum(score * count for score, count in histogram.items())
+        expected_count = sum(histogram.values())
+        expected_rating = (
+            expected_sum / expected_count if expected_count else None
+        )
+        if (
+            score_sum != expected_sum
+            or review_count != expected_count
+            or rating != expected_rating
+            or stored_histograms.get(title_id, {}) != histogram
+        ):
+            drifted.append(Title(
+                id=title_id,
+                score_sum=expected_sum,
+                review_count=expected_count,
+                rating=expected_rating,
+            ))
+
+    comment_count = Coalesce(Subquery(
+        Comments.objects.filter(
+            review=OuterRef('pk'),
+        ).order_by().values('review').annotate(
+            count=Count('id'),
+        ).values('count'),
+    ), 0)
+    stale_reviews = Review.objects.filter(
+        title_id__gte=start,
+        title_id__lt=stop,
+    ).exclude(comment_count=comment_count)
+    if dry_run:
+        stale_comment_counts = stale_reviews.count()
+    else:
+        stale_comment_counts = stale_reviews.update(
+            comment_count=comment_count,
+        )
+
+    if drifted and not dry_run:
+        drifted_ids = [title.id for title in drifted]
+        Title.objects.bulk_update(
+            drifted, ('score_sum', 'review_count', 'rating'),
+        )
+        TitleScoreCount.objects.filter(title_id__in=drifted_ids).delete()
+        TitleScoreCount.objects.bulk_create(
+            TitleScoreCount(title_id=title_id, score=score, count=count)
+            for title_id in drifted_ids
+            for score, count in histograms.get(title_id, {}).items()
+        )
+        rebuild_leaderboards(drifted_ids)
+        bump_versions('title')
+    return checked, len(drifted), stale_comment_counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчёт рейтинга и гистограммы оценок произведений по отзывам '
+        'и счётчиков комментариев отзывов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Размер диапазона id произведений на один запрос',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Количество процессов для пересчёта',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с обработанными диапазонами для продолжения '
+                 'прерванного пересчёта',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать разошедшиеся агрегаты, ничего не менять',
+        )
+
+    def read_checkpoint(self, path):
+        """Обработанные диапазоны id [start, stop) из файла состояния.
+
+        Хранятся границы, а не только начала диапазонов, поэтому
+        продолжать можно и с другим --chunk-size: пропускаются только
+        диапазоны, целиком вошедшие в один обработанный.
+        """
+        if path is None or not path.exists():
+            return []
+        done = []
+        for line in path.read_text().splitlines():
+            try:
+                start, stop = (int(value) for value in line.split())
+            except ValueError:
+                raise CommandError(f'Некорректный файл состояния {path}')
+            done.append((start, stop))
+        return done
+
+    @staticmethod
+    def is_done(start, stop, done):
+        return any(
+            first <= start and stop <= last for first, last in done
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        workers = options['workers']
+        if chunk_size < 1 or workers < 1:
+            raise CommandError(
+                '--chunk-size и --workers должны быть положительными',
+            )
+        checkpoint = options['checkpoint'] and Path(options['checkpoint'])
+        done = self.read_checkpoint(checkpoint)
+
+        bounds = Title.objects.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            self.stdout.write('Произведений нет, пересчитывать нечего')
+            return
+        starts = range(bounds['first'], bounds['last'] + 1, chunk_size)
+        chunks = [
+            start for start in starts
+            if not self.is_done(start, start + chunk_size, done)
+        ]
+        if done:
+            self.stdout.write(
+                'Пропущено уже обработанных диапазонов: '
+                f'{len(starts) - len(chunks)}'
+            )
+
+        started = time.monotonic()
+        checked = drifted = stale_comment_counts = 0
+        dry_run = options['dry_run']
+        log = checkpoint.open('a') if checkpoint and not dry_run else None
+        try:
+            for start, result in self.run_chunks(
+                chunks, chunk_size, workers, dry_run,
+            ):
+                checked += result[0]
+                drifted += result[1]
+                stale_comment_counts += result[2]
+                if log:
+                    log.write(f'{start} {start + chunk_size}\n')
+                    log.flush()
+        finally:
+            if log:
+                log.close()
+        if checkpoint and not dry_run:
+            checkpoint.unlink(missing_ok=True)
+
+        self.stdout.write(
+            f'Проверено произведений: {checked}, '
+            f'разошлось с отзывами: {drifted}, '
+            f'отзывов с неверным числом комментариев: {stale_comment_counts}'
+            f'{" (не исправлено)" if dry_run else ""}, '
+            f'за {time.monotonic() - started:.1f} с'
+        )
+
+    def run_chunks(self, chunks, chunk_size, workers, dry_run):
+        if workers == 1:
+            for start in chunks:
+                yield start, recompute_chunk(
+                    start, start + chunk_size, dry_run,
+                )
+            return
+        connections.close_all()
+        with ProcessPoolExecutor(workers, initializer=init_worker) as pool:
+            futures = {
+                pool.submit(
+                    recompute_chunk, start, start + chunk_size, dry_run,
+                ): start
+                for start in chunks
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
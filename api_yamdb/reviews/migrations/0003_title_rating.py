@@ -0,0 +1,50 @@
+# Generated by Django 3.2 on 2026-10-18 04:27
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_title_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    aggregates = Review.objects.values('title_id').annotate(
+        score_sum=Sum('score'),
+        review_count=Count('id'),
+    ).order_by()
+    titles = []
+    for row in aggregates:
+        titles.append(Title(
+            pk=row['title_id'],
+            score_sum=row['score_sum'],
+            review_count=row['review_count'],
+            rating=row['score_sum'] / row['review_count'],
+        ))
+    Title.objects.bulk_update(
+        titles, ('score_sum', 'review_count', 'rating'), batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, help_text='Средняя оценка, пересчитывается при изменении отзывов', null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Количество отзывов на произведение', verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Сумма оценок всех отзывов на произведение', verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_title_rating, migrations.RunPython.noop),
+    ]
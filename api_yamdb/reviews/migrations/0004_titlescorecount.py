@@ -0,0 +1,45 @@
+# Generated by Django 3.2 on 2026-10-18 04:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def fill_score_counts(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    TitleScoreCount = apps.get_model('reviews', 'TitleScoreCount')
+    histogram = Review.objects.values('title_id', 'score').annotate(
+        count=Count('id'),
+    ).order_by()
+    TitleScoreCount.objects.bulk_create(
+        (TitleScoreCount(**row) for row in histogram),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScoreCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField(help_text='Оценка произведения', verbose_name='Оценка')),
+                ('count', models.PositiveIntegerField(default=0, help_text='Количество отзывов с этой оценкой', verbose_name='Количество отзывов')),
+                ('title', models.ForeignKey(help_text='Произведение, к которому относится оценка', on_delete=django.db.models.deletion.CASCADE, related_name='score_counts', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Распределение оценок',
+                'verbose_name_plural': 'Распределения оценок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlescorecount',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='unique_title_score'),
+        ),
+        migrations.RunPython(fill_score_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 3.2 on 2026-10-18 04:44
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_leaderboards(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    TitleLeaderboard = apps.get_model('reviews', 'TitleLeaderboard')
+    titles = Title.objects.filter(
+        review_count__gte=settings.LEADERBOARD_MIN_REVIEWS,
+    ).values_list('id', 'category_id', 'rating', 'review_count')
+    genres = defaultdict(set)
+    for title_id, genre_id in GenreTitle.objects.filter(
+        title__review_count__gte=settings.LEADERBOARD_MIN_REVIEWS,
+        genre__isnull=False,
+    ).values_list('title_id', 'genre_id'):
+        genres[title_id].add(genre_id)
+    TitleLeaderboard.objects.bulk_create(
+        (
+            TitleLeaderboard(
+                title_id=title_id,
+                genre_id=genre_id,
+                category_id=scope_category_id,
+                rating=rating,
+                review_count=review_count,
+            )
+            for title_id, category_id, rating, review_count in titles
+            for genre_id in (None, *genres[title_id])
+            for scope_category_id in {None, category_id}
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleLeaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.FloatField(help_text='Рейтинг произведения', verbose_name='Рейтинг')),
+                ('review_count', models.PositiveIntegerField(help_text='Количество отзывов на произведение', verbose_name='Количество отзывов')),
+                ('category', models.ForeignKey(blank=True, help_text='Категория рейтинга, пусто — все категории', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.category', verbose_name='Категория')),
+                ('genre', models.ForeignKey(blank=True, help_text='Жанр рейтинга, пусто — все жанры', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.genre', verbose_name='Жанр')),
+                ('title', models.ForeignKey(help_text='Произведение в рейтинге', on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Позиция в рейтинге',
+                'verbose_name_plural': 'Рейтинги произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='titleleaderboard',
+            index=models.Index(fields=['genre', 'category', '-rating', '-review_count', 'title'], name='leaderboard_top_idx'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
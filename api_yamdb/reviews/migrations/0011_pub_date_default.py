@@ -0,0 +1,24 @@
+# Generated by Django 3.2 on 2026-10-18 05:03
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_titleleaderboard'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comments',
+            name='pub_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='Дата публикации проставляется автоматически', verbose_name='Дата публикации комментария'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='pub_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, help_text='Дата публикации отзыва, проставляется автоматически.', verbose_name='Дата публикации'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 06:34
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_pub_date_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSearch',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='fts', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('match', reviews.models.MatchField(db_column='reviews_title_fts')),
+                ('rank', models.FloatField(verbose_name='Релевантность')),
+            ],
+            options={
+                'verbose_name': 'Поисковый индекс произведения',
+                'verbose_name_plural': 'Поисковый индекс произведений',
+                'db_table': 'reviews_title_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from reviews.validators import validate_title_year
 from user.models import User
 
@@ -24,6 +25,9 @@ class Category(models.Model):
         ordering = ('name',)
         verbose_name = 'Категория'
         verbose_name_plural = 'Категории'
+        indexes = (
+            models.Index(fields=('name',), name='category_name_idx'),
+        )
 
     def __str__(self):
         return self.name
@@ -48,6 +52,9 @@ class Genre(models.Model):
         ordering = ('name',)
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
+        indexes = (
+            models.Index(fields=('name',), name='genre_name_idx'),
+        )
 
     def __str__(self):
         return self.name
@@ -92,10 +99,45 @@ class Title(models.Model):
         help_text='Укажите жанр',
     )
 
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Рейтинг',
+        help_text='Средняя оценка, пересчитывается при изменении отзывов',
+    )
+
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+        help_text='Сумма оценок всех отзывов на произведение',
+    )
+
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов',
+        help_text='Количество отзывов на произведение',
+    )
+
     class Meta:
         ordering = ('name',)
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            models.Index(fields=('name', 'id'), name='title_name_idx'),
+            models.Index(
+                fields=('year', 'name', 'id'),
+                name='title_year_name_idx',
+            ),
+            models.Index(fields=('year', 'id'), name='title_year_idx'),
+            models.Index(fields=('rating', 'id'), name='title_rating_idx'),
+            models.Index(
+                fields=('review_count', 'id'),
+                name='title_review_count_idx',
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -122,10 +164,110 @@ class GenreTitle(models.Model):
         help_text='Необходим жанр',
     )
 
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('genre', 'title'),
+                name='genretitle_genre_title_idx',
+            ),
+        )
+
     def __str__(self):
         return f'{self.title} {self.genre}'
 
 
+class TitleScoreCount(models.Model):
+    """Количество отзывов с данной оценкой на произведение."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='score_counts',
+        verbose_name='Произведение',
+        help_text='Произведение, к которому относится оценка',
+    )
+    score = models.IntegerField(
+        verbose_name='Оценка',
+        help_text='Оценка произведения',
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов',
+        help_text='Количество отзывов с этой оценкой',
+    )
+
+    class Meta:
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'score'),
+                name='unique_title_score',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} x {self.count}'
+
+
+class TitleLeaderboard(models.Model):
+    """Позиция произведения в рейтинге жанра и категории.
+
+    На каждое произведение с достаточным числом отзывов приходится
+    строка на каждую пару (жанр или все, категория или все), поэтому
+    топ любого среза читается по индексу без агрегации отзывов.
+    """
+
+    genre = models.ForeignKey(
+        Genre,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Жанр',
+        help_text='Жанр рейтинга, пусто — все жанры',
+    )
+    category = models.ForeignKey(
+        Category,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Категория',
+        help_text='Категория рейтинга, пусто — все категории',
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries',
+        verbose_name='Произведение',
+        help_text='Произведение в рейтинге',
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        help_text='Рейтинг произведения',
+    )
+    review_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        help_text='Количество отзывов на произведение',
+    )
+
+    class Meta:
+        verbose_name = 'Позиция в рейтинге'
+        verbose_name_plural = 'Рейтинги произведений'
+        indexes = (
+            models.Index(
+                fields=(
+                    'genre', 'category', '-rating', '-review_count', 'title',
+                ),
+                name='leaderboard_top_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.genre_id}/{self.category_id}: {self.title_id}'
+
+
 class Review(models.Model):
     """Модель отзывов на произведения."""
 
@@ -157,10 +299,17 @@ class Review(models.Model):
         help_text='Укажите оценку произведения',
     )
     pub_date = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name='Дата публикации',
         help_text='Дата публикации отзыва, проставляется автоматически.',
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+        help_text='Количество комментариев к отзыву',
+    )
 
     class Meta:
 
@@ -173,10 +322,22 @@ class Review(models.Model):
                 name='unique_review',
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        # Агрегаты рейтинга обновляются в post_save,
+        # поэтому отзыв и рейтинг сохраняются в одной транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comments(models.Model):
     """Модель комментария."""
@@ -200,7 +361,8 @@ class Comments(models.Model):
         help_text='Текст комментария, который пишет пользователь',
     )
     pub_date = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name='Дата публикации комментария',
         help_text='Дата публикации проставляется автоматически',
     )
@@ -209,6 +371,81 @@ class Comments(models.Model):
         ordering = ('pub_date',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.text[:15]
+
+
+class ResourceVersion(models.Model):
+    """Версия набора данных, увеличивается при каждой его записи."""
+
+    key = models.CharField(
+        max_length=64,
+        primary_key=True,
+        verbose_name='Ключ',
+        help_text='Набор данных, например title или title-1',
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Версия',
+    )
+    modified = models.DateTimeField(
+        verbose_name='Время изменения',
+    )
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.key}: {self.version}'
+
+
+class MatchField(models.TextField):
+    """Скрытая колонка FTS5-таблицы с её именем: цель оператора MATCH."""
+
+
+@MatchField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class TitleSearch(models.Model):
+    """Строка FTS5-индекса произведений (reviews_title_fts).
+
+    Таблица создаётся миграцией 0007_title_search и поддерживается
+    триггерами, поэтому модель неуправляемая. Связь с Title по rowid
+    даёт один JOIN индекса вместо подзапроса на каждую строку.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='fts',
+        verbose_name='Произведение',
+    )
+    match = MatchField(db_column='reviews_title_fts')
+    rank = models.FloatField(verbose_name='Релевантность')
+
+    class Meta:
+        managed = False
+        db_table = 'reviews_title_fts'
+        verbose_name = 'Поисковый индекс произведения'
+        verbose_name_plural = 'Поисковый индекс произведений'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.rank}'
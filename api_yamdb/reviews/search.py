@@ -0,0 +1,112 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from reviews.models import Title
+
+FTS_TABLE = 'reviews_title_fts'
+TITLE_TABLE = Title._meta.db_table
+
+CREATE_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+    f'name, description, content={TITLE_TABLE}, content_rowid=id)',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT '
+    f'ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    f'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE '
+    f'ON {TITLE_TABLE} BEGIN '
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE '
+    f'OF name, description ON {TITLE_TABLE} BEGIN '
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description) "
+    f"VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+    f'VALUES (new.id, new.name, new.description); END',
+)
+DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+
+def fts5_available(db=connection):
+    """Собран ли SQLite с поддержкой FTS5."""
+    if db.vendor != 'sqlite':
+        return False
+    with db.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return 'ENABLE_FTS5' in {row[0] for row in cursor.fetchall()}
+
+
+def create_search_index(db=connection):
+    """Создаёт FTS5-индекс произведений и триггеры синхронизации.
+
+    Возвращает False, если FTS5 недоступен.
+    """
+    if not fts5_available(db):
+        return False
+    with db.cursor() as cursor:
+        for sql in CREATE_SQL:
+            cursor.execute(sql)
+    db.title_search_enabled = True
+    return True
+
+
+def drop_search_index(db=connection):
+    if db.vendor != 'sqlite':
+        return
+    with db.cursor() as cursor:
+        for sql in DROP_SQL:
+            cursor.execute(sql)
+    db.title_search_enabled = False
+
+
+def rebuild_search_index(db=connection):
+    """Заново заполняет FTS5-индекс по таблице произведений."""
+    if not create_search_index(db):
+        return False
+    with db.cursor() as cursor:
+        cursor.execute(REBUILD_SQL)
+    return True
+
+
+def search_enabled(db=connection):
+    enabled = getattr(db, 'title_search_enabled', None)
+    if enabled is None:
+        enabled = (
+            db.vendor == 'sqlite'
+            and FTS_TABLE in db.introspection.table_names()
+        )
+        db.title_search_enabled = enabled
+    return enabled
+
+
+def build_match_query(text):
+    """Запрос FTS5 из пользовательской строки: все слова, по префиксу."""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def search_titles(queryset, text):
+    """Фильтрует произведения по названию и описанию.
+
+    С FTS5 индекс присоединяется одним JOIN по rowid (TitleSearch),
+    и результаты упорядочены по его колонке rank (bm25); подсчёт
+    строк сортировку не выполняет. Без FTS5 используется поиск
+    подстроки.
+    """
+    if not search_enabled():
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text),
+        )
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    return queryset.filter(fts__match__match=match).order_by(
+        'fts__rank', 'name', 'id',
+    )
@@ -0,0 +1,63 @@
+import datetime
+
+from reviews.models import Category, Comments, Genre, GenreTitle, Review, Title
+from user.models import User
+
+# Файлы static/data в порядке загрузки: имя файла, модель и колонки
+# CSV с полями модели, в которые они загружаются.
+TABLES = (
+    ('users', User, {
+        'id': 'id',
+        'username': 'username',
+        'email': 'email',
+        'role': 'role',
+        'bio': 'bio',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+    }),
+    ('genre', Genre, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    ('category', Category, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    ('titles', Title, {
+        'id': 'id',
+        'name': 'name',
+        'year': 'year',
+        'category': 'category',
+    }),
+    ('genre_title', GenreTitle, {
+        'id': 'id',
+        'title_id': 'title',
+        'genre_id': 'genre',
+    }),
+    ('review', Review, {
+        'id': 'id',
+        'title_id': 'title',
+        'text': 'text',
+        'author': 'author',
+        'score': 'score',
+        'pub_date': 'pub_date',
+    }),
+    ('comments', Comments, {
+        'id': 'id',
+        'review_id': 'review',
+        'text': 'text',
+        'author': 'author',
+        'pub_date': 'pub_date',
+    }),
+)
+
+
+def get_fields(model, columns):
+    """Поля модели для колонок CSV, в порядке колонок."""
+    return [model._meta.get_field(name) for name in columns.values()]
+
+
+def format_value(value):
+    """Значение колонки в формате файлов static/data."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime.datetime):
+        value = value.astimezone(datetime.timezone.utc)
+        return (
+            f'{value:%Y-%m-%dT%H:%M:%S}.{value.microsecond // 1000:03}Z'
+        )
+    return value
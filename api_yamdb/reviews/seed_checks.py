@@ -0,0 +1,189 @@
+from collections import Counter
+from csv import reader
+from operator import itemgetter
+
+from django.core.exceptions import ValidationError
+from django.db import models
+
+from reviews.seed import TABLES, get_fields
+
+# Сколько примеров строк и значений печатается для одной ошибки.
+EXAMPLES = 5
+
+
+def read_columns(path, columns):
+    """Колонки CSV файла: колонка -> список значений по записям.
+
+    Записи с другим числом значений, чем в заголовке, не попадают
+    в колонки, их номера возвращаются отдельно, как и колонки,
+    которых нет в заголовке. Номера записей, попавших в колонки,
+    тоже возвращаются: после пропущенных записей они не совпадают
+    с позицией значения в колонке.
+    """
+    with open(path, encoding='utf8', newline='') as file:
+        rows = reader(file)
+        header = next(rows, [])
+        missing = [column for column in columns if column not in header]
+        columns = [column for column in columns if column in header]
+        # В кортеж, даже если колонка одна.
+        pick = itemgetter(*[header.index(column) for column in columns], 0)
+        width = len(header)
+        picked, numbers, broken = [], [], []
+        for number, row in enumerate(rows, 1):
+            if not row:
+                continue
+            if len(row) == width:
+                picked.append(pick(row))
+                numbers.append(number)
+            else:
+                broken.append(number)
+    values = list(zip(*picked)) or [()] * len(columns)
+    return dict(zip(columns, values)), numbers, broken, missing
+
+
+def convert_values(field, values):
+    """Проверяет различные значения колонки полем модели.
+
+    Каждое различное значение приводится к типу поля и проверяется
+    его валидаторами один раз. Возвращает словарь значение -> значение
+    поля для правильных значений и сообщение -> множество значений
+    для неправильных.
+    """
+    valid, invalid = {}, {}
+    for value in set(values):
+        if value == '' and (field.null or field.blank):
+            valid[value] = None if field.null else value
+            continue
+        try:
+            if value == '':
+                raise ValidationError('Обязательное поле.')
+            converted = field.to_python(value)
+            field.run_validators(converted)
+        except ValidationError as error:
+            invalid.setdefault(' '.join(error.messages), set()).add(value)
+        else:
+            valid[value] = converted
+    return valid, invalid
+
+
+def find_duplicates(values):
+    """Значения, встречающиеся больше одного раза, кроме None."""
+    return {
+        value for value, count in Counter(values).items()
+        if count > 1 and value is not None
+    }
+
+
+class TableCheck:
+    """Колонки файла таблицы и найденные в них ошибки."""
+
+    def __init__(self, name, model, columns, path):
+        self.name = name
+        self.model = model
+        self.issues = []
+        # Текстовые колонки большие и не проверяются.
+        self.fields = {
+            column: field
+            for column, field in zip(columns, get_fields(model, columns))
+            if not isinstance(field, models.TextField)
+        }
+        raw, self.numbers, broken, missing = read_columns(
+            path, list(self.fields),
+        )
+        self.rows = len(self.numbers)
+        if broken:
+            self.add('', 'неверное число колонок', broken, ())
+        for column in missing:
+            self.add(column, 'нет колонки', None, ())
+            del self.fields[column]
+        self.values = {}
+        for column, field in self.fields.items():
+            valid, invalid = convert_values(field, raw[column])
+            for message, bad in invalid.items():
+                self.add_values(column, message, raw[column], bad)
+            self.values[column] = [valid.get(value) for value in raw[column]]
+
+    def add(self, column, message, numbers, values):
+        self.issues.append((column, message, numbers, values))
+
+    def add_values(self, column, message, column_values, bad):
+        """Ошибка для всех записей, где значение колонки из bad."""
+        self.add(column, message, [
+            number for number, value in zip(self.numbers, column_values)
+            if value in bad
+        ], bad)
+
+    def check_unique(self):
+        for column, field in self.fields.items():
+            if field.unique:
+                self.add_values(
+                    column, 'повторяется', self.values[column],
+                    find_duplicates(self.values[column]),
+                )
+        for constraint in self.model._meta.constraints:
+            columns = [
+                column for column, field in self.fields.items()
+                if field.name in getattr(constraint, 'fields', ())
+            ]
+            if len(columns) < 2 or len(columns) != len(constraint.fields):
+                continue
+            pairs = list(zip(*(self.values[column] for column in columns)))
+            self.add_values(
+                '+'.join(columns), 'сочетание повторяется', pairs,
+                find_duplicates(pairs),
+            )
+
+    def check_references(self, ids):
+        """Внешние ключи — разность множеств с id связанных таблиц."""
+        for column, field in self.fields.items():
+            if not field.is_relation:
+                continue
+            values = self.values[column]
+            missing = set(values) - ids[field.related_model] - {None}
+            if missing:
+                self.add_values(
+                    column,
+                    f'нет в {field.related_model._meta.db_table}',
+                    values, missing,
+                )
+
+    def report(self):
+        for column, message, numbers, values in self.issues:
+            if numbers is None:
+                yield f'{self.name}.csv, {column}: {message}'
+                continue
+            if not numbers:
+                continue
+            examples = ', '.join(map(str, numbers[:EXAMPLES]))
+            sample = ', '.join(sorted(map(str, values))[:EXAMPLES])
+            yield (
+                f'{self.name}.csv{", " if column else ""}{column}: '
+                f'{message} — {len(numbers)} строк (записи {examples}'
+                f'{"; значения " + sample if sample else ""})'
+            )
+
+
+def check_seed(directory):
+    """Проверяет CSV файлы каталога до загрузки.
+
+    Возвращает число проверенных записей и строки отчёта об ошибках.
+    Внешние ключи ищутся в id связанных файлов и в уже загруженных
+    строках БД.
+    """
+    checks = [
+        TableCheck(name, model, columns, directory / f'{name}.csv')
+        for name, model, columns in TABLES
+        if (directory / f'{name}.csv').exists()
+    ]
+    ids = {
+        model: set(model.objects.values_list('pk', flat=True))
+        for _, model, _ in TABLES
+    }
+    for check in checks:
+        ids[check.model].update(check.values.get('id', ()))
+    report = []
+    for check in checks:
+        check.check_unique()
+        check.check_references(ids)
+        report.extend(check.report())
+    return sum(check.rows for check in checks), report
@@ -0,0 +1,183 @@
+from django.db.models import Case, ExpressionWrapper, F, FloatField, When
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+from django.dispatch import receiver
+
+from reviews.leaderboards import (add_genre_entries, rebuild_leaderboards,
+                                  remove_genre_entries, update_leaderboard)
+from reviews.models import (Category, Comments, Genre, GenreTitle, Review,
+                            Title, TitleLeaderboard, TitleScoreCount)
+from reviews.versions import bump_versions
+from user.models import User
+
+
+def update_title_rating(title_id, score_delta, count_delta):
+    """Атомарно сдвигает сумму, количество оценок и рейтинг произведения."""
+    if not score_delta and not count_delta:
+        return
+    Title.objects.filter(pk=title_id).update(
+        score_sum=F('score_sum') + score_delta,
+        review_count=F('review_count') + count_delta,
+        rating=Case(
+            When(
+                review_count__gt=-count_delta,
+                then=ExpressionWrapper(
+                    (F('score_sum') + score_delta) * 1.0
+                    / (F('review_count') + count_delta),
+                    output_field=FloatField(),
+                ),
+            ),
+            default=None,
+            output_field=FloatField(),
+        ),
+    )
+
+
+def update_score_count(title_id, score, delta):
+    """Сдвигает счётчик отзывов с оценкой score в гистограмме."""
+    updated = TitleScoreCount.objects.filter(
+        title_id=title_id,
+        score=score,
+    ).update(count=F('count') + delta)
+    if not updated and delta > 0:
+        TitleScoreCount.objects.create(
+            title_id=title_id,
+            score=score,
+            count=delta,
+        )
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    instance._saved_score = None
+    if instance.pk is not None:
+        instance._saved_score = Review.objects.filter(
+            pk=instance.pk,
+        ).values_list('score', flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    old_score = getattr(instance, '_saved_score', None)
+    score = int(instance.score)
+    if created or old_score is None:
+        update_title_rating(instance.title_id, score, 1)
+        update_score_count(instance.title_id, score, 1)
+    elif score != old_score:
+        update_title_rating(instance.title_id, score - old_score, 0)
+        update_score_count(instance.title_id, old_score, -1)
+        update_score_count(instance.title_id, score, 1)
+    else:
+        return
+    update_leaderboard(instance.title_id)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    update_title_rating(instance.title_id, -int(instance.score), -1)
+    update_score_count(instance.title_id, int(instance.score), -1)
+    update_leaderboard(instance.title_id, create=False)
+
+
+@receiver(post_save, sender=Comments)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        Review.objects.filter(pk=instance.review_id).update(
+            comment_count=F('comment_count') + 1,
+        )
+
+
+@receiver(post_delete, sender=Comments)
+def comment_deleted(sender, instance, **kwargs):
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') - 1,
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    bump_versions('category')
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, instance, **kwargs):
+    bump_versions('genre')
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, **kwargs):
+    if not created:
+        rebuild_leaderboards([instance.pk])
+
+
+@receiver(post_save, sender=GenreTitle)
+def genre_title_saved(sender, instance, created, **kwargs):
+    if created and instance.genre_id is not None:
+        add_genre_entries(instance.title_id, [instance.genre_id])
+
+
+@receiver(post_delete, sender=GenreTitle)
+def genre_title_deleted(sender, instance, **kwargs):
+    if instance.genre_id is not None:
+        remove_genre_entries(instance.title_id, [instance.genre_id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_leaderboard(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        if action == 'post_add':
+            add_genre_entries(instance.pk, pk_set)
+        else:
+            remove_genre_entries(instance.pk, pk_set)
+    elif action == 'post_clear':
+        TitleLeaderboard.objects.filter(genre=instance).delete()
+    else:
+        update = (
+            add_genre_entries if action == 'post_add'
+            else remove_genre_entries
+        )
+        for title_id in pk_set:
+            update(title_id, [instance.pk])
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def title_changed(sender, instance, **kwargs):
+    bump_versions('title', f'title-{instance.pk}')
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def genre_title_changed(sender, instance, **kwargs):
+    bump_versions('title')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_versions('title')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    bump_versions(
+        'title', f'title-{instance.title_id}', f'review-{instance.pk}',
+    )
+
+
+@receiver(post_save, sender=Comments)
+@receiver(post_delete, sender=Comments)
+def comment_changed(sender, instance, **kwargs):
+    bump_versions(f'review-{instance.review_id}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    bump_versions('user')
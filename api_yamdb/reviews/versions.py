@@ -0,0 +1,39 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from reviews.models import ResourceVersion
+
+
+def bump_versions(*keys):
+    """Увеличивает версии наборов данных после записи в них."""
+    now = timezone.now()
+    for key in keys:
+        updated = ResourceVersion.objects.filter(key=key).update(
+            version=F('version') + 1,
+            modified=now,
+        )
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                ResourceVersion.objects.create(
+                    key=key,
+                    version=1,
+                    modified=now,
+                )
+        except IntegrityError:
+            ResourceVersion.objects.filter(key=key).update(
+                version=F('version') + 1,
+                modified=now,
+            )
+
+
+def get_versions(keys):
+    """Версии и время изменения наборов данных одним запросом."""
+    return {
+        key: (version, modified)
+        for key, version, modified in ResourceVersion.objects.filter(
+            key__in=keys,
+        ).values_list('key', 'version', 'modified')
+    }
@@ -1,3 +1,4 @@
+from api.mixins import SparseFieldsSerializerMixin
 from django.conf import settings
 from django.core.validators import RegexValidator
 from django.shortcuts import get_object_or_404
@@ -11,7 +12,8 @@ from .models import User
 USERNAME_CHECK = r'^[\w.@+-]+$'
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsSerializerMixin,
+                     serializers.ModelSerializer):
     username = serializers.CharField(
         max_length=settings.LENGTH_USERNAME,
         validators=[
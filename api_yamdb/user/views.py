@@ -1,3 +1,5 @@
+from api.mixins import (ConditionalListRetrieveMixin,
+                        SparseFieldsViewMixin)
 from api.permissions import IsAdmin
 from api.utils import send_confirmation_code_to_email
 from django.shortcuts import get_object_or_404
@@ -18,9 +20,10 @@ from .serializers import (
 )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsViewMixin, ConditionalListRetrieveMixin,
+                  viewsets.ModelViewSet):
     """ViewSet для модели User"""
-    queryset = User.objects.all()
+    queryset = User.objects.order_by('username')
     serializer_class = UserSerializer
     lookup_field = 'username'
     http_method_names = ('get', 'post', 'path',
@@ -28,6 +31,13 @@ class UserViewSet(viewsets.ModelViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
     permission_classes = [IsAuthenticated, IsAdmin, ]
+    keyset_ordering = ('username', 'id')
+    version_keys = ('user',)
+    # Удаление пользователя удаляет его отзывы по одному.
+    query_budget = {
+        'list': 5, 'retrieve': 4, 'create': 6, 'update': 5,
+        'partial_update': 5, 'me': 4, 'destroy': None,
+    }
 
     @action(
         methods=['get', 'patch'],
@@ -50,6 +60,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
 class SignupView(APIView):
     permission_classes = (AllowAny,)
+    query_budget = {'post': 10}
 
     def post(self, request):
         username = request.data.get('username')
@@ -93,6 +104,7 @@ class SignupView(APIView):
 class GetTokenView(TokenObtainPairView):
     serializer_class = GetTokenSerializer
     permission_classes = [AllowAny]
+    query_budget = {'post': 4}
 
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
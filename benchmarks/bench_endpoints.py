@@ -0,0 +1,381 @@
+"""Задержка, число запросов и память для каждого маршрута api/urls.py.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_endpoints.py --scales 1k 100k --output new.json
+    python benchmarks/bench_endpoints.py --scales 1k --baseline old.json
+    python benchmarks/bench_endpoints.py --results new.json \
+        --baseline old.json
+
+Для каждого масштаба создаёт временную базу, наполняет её командой
+generate_data и выполняет сценарии CASES тестовым клиентом Django
+от имени администратора: анонимным ответы отдаются из кеша. Запросы,
+меняющие данные, выполняются в транзакции, которая откатывается,
+поэтому каждое повторение видит ту же базу. Для сценария
+записываются p50 и p99 задержки по --repeat запросам, число SQL
+запросов и пик памяти по tracemalloc за один запрос.
+
+С --baseline результаты сравниваются с сохранёнными: код выхода 1,
+если задержка или память выросли больше чем на --threshold, или
+выросло число запросов. С --results сравниваются два файла без
+замеров.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import (setup_test_environment,  # noqa: E402
+                               teardown_test_environment)
+from django.urls import URLPattern  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from api import urls  # noqa: E402
+from reviews.models import Category, Genre, Review, Title  # noqa: E402
+from user.models import User  # noqa: E402
+
+# Параметры generate_data для масштабов, по числу отзывов.
+SCALES = {
+    '1k': ('--reviews', '1000', '--titles', '100', '--users', '200'),
+    '100k': ('--reviews', '100000', '--titles', '2000', '--users', '5000'),
+    '1m': ('--reviews', '1000000', '--titles', '10000', '--users', '50000'),
+}
+TITLES = '/api/v1/titles'
+REVIEWS = f'{TITLES}/{{title}}/reviews'
+COMMENTS = f'{TITLES}/{{comment_title}}/reviews/{{review}}/comments'
+# Сценарии: имя, маршрут, метод, путь, тело запроса, ожидаемый статус.
+# В пути и строках тела подставляются id и slug из context().
+CASES = (
+    ('api-root', 'api-root', 'get', '/api/v1/', None, 200),
+    ('signup', 'signup', 'post', '/api/v1/auth/signup/', {
+        'username': 'bench_signup', 'email': 'bench_signup@yamdb.fake',
+    }, 200),
+    ('get_token', 'get_token', 'post', '/api/v1/auth/token/', {
+        'username': '{username}', 'confirmation_code': '{code}',
+    }, 200),
+    ('users list', 'users-list', 'get', '/api/v1/users/', None, 200),
+    ('users search', 'users-list', 'get', '/api/v1/users/?search=user1',
+     None, 200),
+    ('users create', 'users-list', 'post', '/api/v1/users/', {
+        'username': 'bench_user', 'email': 'bench_user@yamdb.fake',
+    }, 201),
+    ('users detail', 'users-detail', 'get', '/api/v1/users/{username}/',
+     None, 200),
+    ('users update', 'users-detail', 'patch', '/api/v1/users/{username}/',
+     {'bio': 'Новое био'}, 200),
+    ('users delete', 'users-detail', 'delete', '/api/v1/users/{username}/',
+     None, 204),
+    ('users me', 'users-me', 'get', '/api/v1/users/me/', None, 200),
+    ('users me update', 'users-me', 'patch', '/api/v1/users/me/',
+     {'bio': 'Новое био'}, 200),
+    ('categories list', 'categories-list', 'get', '/api/v1/categories/',
+     None, 200),
+    ('categories create', 'categories-list', 'post', '/api/v1/categories/',
+     {'name': 'Новая', 'slug': 'bench-category'}, 201),
+    ('categories delete', 'categories-detail', 'delete',
+     '/api/v1/categories/{category}/', None, 204),
+    ('genres list', 'genres-list', 'get', '/api/v1/genres/', None, 200),
+    ('genres create', 'genres-list', 'post', '/api/v1/genres/',
+     {'name': 'Новый', 'slug': 'bench-genre'}, 201),
+    ('genres delete', 'genres-detail', 'delete', '/api/v1/genres/{genre}/',
+     None, 204),
+    ('titles list', 'titles-list', 'get', f'{TITLES}/', None, 200),
+    ('titles list limit 100', 'titles-list', 'get', f'{TITLES}/?limit=100',
+     None, 200),
+    ('titles by rating', 'titles-list', 'get',
+     f'{TITLES}/?ordering=-rating', None, 200),
+    ('titles by genre', 'titles-list', 'get', f'{TITLES}/?genre={{genre}}',
+     None, 200),
+    ('titles search', 'titles-list', 'get', f'{TITLES}/?search={{word}}',
+     None, 200),
+    ('titles create', 'titles-list', 'post', f'{TITLES}/', {
+        'name': 'Новое произведение', 'year': 2000,
+        'category': '{category}', 'genre': ['{genre}'],
+    }, 201),
+    ('titles detail', 'titles-detail', 'get', f'{TITLES}/{{title}}/', None,
+     200),
+    ('titles update', 'titles-detail', 'patch', f'{TITLES}/{{title}}/',
+     {'name': 'Новое название'}, 200),
+    ('titles delete', 'titles-detail', 'delete',
+     f'{TITLES}/{{typical_title}}/', None, 204),
+    ('titles top', 'titles-top', 'get', f'{TITLES}/top/', None, 200),
+    ('titles top by genre', 'titles-top', 'get',
+     f'{TITLES}/top/?genre={{genre}}', None, 200),
+    ('titles rating distribution', 'titles-rating-distribution', 'get',
+     f'{TITLES}/{{title}}/rating-distribution/', None, 200),
+    ('titles bulk', 'titles-bulk', 'post', f'{TITLES}/bulk/', [
+        {'name': f'Пакет {number}', 'year': 2000, 'category': '{category}',
+         'genre': ['{genre}']}
+        for number in range(100)
+    ], 201),
+    ('reviews list', 'titles_reviews-list', 'get', f'{REVIEWS}/', None, 200),
+    ('reviews list limit 100', 'titles_reviews-list', 'get',
+     f'{REVIEWS}/?limit=100', None, 200),
+    ('reviews create', 'titles_reviews-list', 'post', f'{REVIEWS}/',
+     {'text': 'Отзыв', 'score': 7}, 201),
+    ('reviews detail', 'titles_reviews-detail', 'get',
+     f'{REVIEWS}/{{title_review}}/', None, 200),
+    ('reviews update', 'titles_reviews-detail', 'patch',
+     f'{REVIEWS}/{{title_review}}/', {'score': 3}, 200),
+    ('reviews delete', 'titles_reviews-detail', 'delete',
+     f'{REVIEWS}/{{title_review}}/', None, 204),
+    ('comments list', 'reviews_comments-list', 'get', f'{COMMENTS}/', None,
+     200),
+    ('comments create', 'reviews_comments-list', 'post', f'{COMMENTS}/',
+     {'text': 'Комментарий'}, 201),
+    ('comments detail', 'reviews_comments-detail', 'get',
+     f'{COMMENTS}/{{comment}}/', None, 200),
+    ('comments update', 'reviews_comments-detail', 'patch',
+     f'{COMMENTS}/{{comment}}/', {'text': 'Исправлено'}, 200),
+    ('comments delete', 'reviews_comments-detail', 'delete',
+     f'{COMMENTS}/{{comment}}/', None, 204),
+    ('export titles', 'export', 'get', '/api/v1/export/titles.ndjson',
+     None, 200),
+    ('export reviews tail', 'export', 'get',
+     '/api/v1/export/reviews.ndjson?after={reviews_tail}', None, 200),
+)
+# Рост метрики меньше этого не считается регрессией: шум замеров.
+MIN_DELTA = {'p50_ms': 1.0, 'p99_ms': 2.0, 'memory_kb': 64.0, 'queries': 0}
+
+
+def route_names(patterns):
+    """Имена маршрутов, включая вложенные include()."""
+    for pattern in patterns:
+        if isinstance(pattern, URLPattern):
+            if pattern.name:
+                yield pattern.name
+        else:
+            yield from route_names(pattern.url_patterns)
+
+
+def check_coverage():
+    missing = set(route_names(urls.urlpatterns)) - {
+        case[1] for case in CASES
+    }
+    if missing:
+        sys.exit(f'Нет сценариев для маршрутов: {", ".join(sorted(missing))}')
+
+
+def context():
+    """id и slug для путей: самые нагруженные произведение и отзыв.
+
+    Удаляется произведение со средним числом отзывов: удаление
+    отзывов по одному делает удаление самого популярного слишком
+    долгим для повторений.
+    """
+    titles = Title.objects.order_by('-review_count', 'id')
+    title = titles.first()
+    review = Review.objects.order_by('-comment_count', 'id').first()
+    user = User.objects.get(pk=2)
+    user.confirmation_code = 'benchcode'
+    user.save(update_fields=('confirmation_code',))
+    return {
+        'title': title.pk,
+        'typical_title': titles[titles.count() // 2].pk,
+        'title_review': title.reviews.order_by('id').first().pk,
+        'comment_title': review.title_id,
+        'review': review.pk,
+        'comment': review.comments.order_by('id').first().pk,
+        'category': Category.objects.order_by('id').first().slug,
+        'genre': Genre.objects.order_by('id').first().slug,
+        'word': title.name.split()[-1],
+        'username': user.username,
+        'code': user.confirmation_code,
+        'reviews_tail': max(Review.objects.order_by('-id').first().pk - 1000,
+                            0),
+    }
+
+
+def fill(value, values):
+    if isinstance(value, str):
+        return value.format(**values)
+    if isinstance(value, list):
+        return [fill(item, values) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, values) for key, item in value.items()}
+    return value
+
+
+def percentile(timings, share):
+    """Значение по ближайшему рангу в отсортированном списке."""
+    return timings[max(math.ceil(share * len(timings)) - 1, 0)]
+
+
+class QueryCounter:
+    """execute_wrapper, считающий SQL запросы.
+
+    CaptureQueriesContext не подходит: сигнал request_started
+    очищает connection.queries_log.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Runner:
+    """Выполняет сценарий тестовым клиентом, откатывая запись."""
+
+    def __init__(self, values):
+        self.values = values
+        self.admin = APIClient()
+        self.admin.force_authenticate(User.objects.create(
+            username='bench', email='bench@yamdb.fake', role='admin',
+        ))
+        self.anonymous = APIClient()
+
+    def request(self, case):
+        name, route, method, path, data, expected = case
+        client = self.anonymous if route in ('signup', 'get_token') else (
+            self.admin
+        )
+        options = {} if method == 'get' else {'format': 'json'}
+        with transaction.atomic():
+            response = getattr(client, method)(
+                fill(path, self.values), fill(data, self.values), **options,
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+            if method != 'get':
+                transaction.set_rollback(True)
+        if response.status_code != expected:
+            sys.exit(f'{name}: статус {response.status_code} вместо '
+                     f'{expected}')
+
+    def measure(self, case, repeat):
+        self.request(case)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            self.request(case)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        queries = QueryCounter()
+        with connection.execute_wrapper(queries):
+            self.request(case)
+        tracemalloc.start()
+        try:
+            self.request(case)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return {
+            'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'queries': queries.count,
+            'memory_kb': round(peak / 1024, 1),
+        }
+
+
+def run_scale(scale, repeat, only):
+    # С DEBUG запросы пишутся в connection.queries и замедляют ответы.
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.monotonic()
+        call_command('generate_data', *SCALES[scale], stdout=io.StringIO())
+        print(f'{scale}: данные за {time.monotonic() - started:.0f} с')
+        runner = Runner(context())
+        endpoints = {}
+        for case in CASES:
+            if only and case[0] not in only:
+                continue
+            endpoints[case[0]] = runner.measure(case, repeat)
+            print(f'  {case[0]:<28} {format_metrics(endpoints[case[0]])}')
+        return endpoints
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def format_metrics(metrics):
+    return (f'p50 {metrics["p50_ms"]:8.2f} мс  p99 {metrics["p99_ms"]:8.2f} '
+            f'мс  запросов {metrics["queries"]:3}  память '
+            f'{metrics["memory_kb"]:9.1f} КБ')
+
+
+def compare(baseline, results, threshold):
+    """Регрессии результатов относительно baseline, строками отчёта."""
+    regressions = []
+    for scale, endpoints in results['scales'].items():
+        old_endpoints = baseline['scales'].get(scale, {})
+        for name, metrics in endpoints.items():
+            old = old_endpoints.get(name)
+            if old is None:
+                continue
+            for metric, min_delta in MIN_DELTA.items():
+                limit = old[metric] * (1 + threshold)
+                if metric == 'queries':
+                    limit = old[metric]
+                if (metrics[metric] > limit
+                        and metrics[metric] - old[metric] > min_delta):
+                    regressions.append(
+                        f'{scale} {name}: {metric} {old[metric]} -> '
+                        f'{metrics[metric]}'
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', nargs='+', choices=SCALES,
+                        default=list(SCALES))
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--only', nargs='+', help='Только эти сценарии')
+    parser.add_argument('--output', help='Файл для результатов в JSON')
+    parser.add_argument('--baseline', help='Результаты для сравнения')
+    parser.add_argument('--results',
+                        help='Сравнить этот файл, не выполняя замеры')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Допустимый рост задержки и памяти, доля')
+    args = parser.parse_args()
+
+    if args.results:
+        results = json.loads(Path(args.results).read_text())
+    else:
+        check_coverage()
+        results = {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'repeat': args.repeat,
+            'scales': {
+                scale: run_scale(scale, args.repeat, args.only)
+                for scale in args.scales
+            },
+        }
+    if args.output:
+        Path(args.output).write_text(
+            json.dumps(results, ensure_ascii=False, indent=2),
+        )
+    if not args.baseline:
+        return
+    regressions = compare(
+        json.loads(Path(args.baseline).read_text()), results, args.threshold,
+    )
+    for line in regressions:
+        print(line)
+    if regressions:
+        sys.exit(f'Регрессий: {len(regressions)}')
+    print('Регрессий нет')
+
+
+if __name__ == '__main__':
+    main()
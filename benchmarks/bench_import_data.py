@@ -0,0 +1,62 @@
+"""Скорость import_data по таблицам, в строках в секунду.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_import_data.py --reviews 100000 --jobs 4
+
+Пишет во временный каталог csv файлы командой generate_data
+и загружает их командой import_data во временную базу; с
+--validate-only замеряет только проверку файлов.
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (setup_test_environment,  # noqa: E402
+                               teardown_test_environment)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=100000)
+    parser.add_argument('--titles', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--validate-only', action='store_true')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        call_command(
+            'generate_data', '--output', 'csv', '--path', str(directory),
+            '--reviews', str(args.reviews), '--titles', str(args.titles),
+            '--users', str(args.users),
+        )
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            call_command(
+                'import_data', '--path', str(directory),
+                '--batch-size', str(args.batch_size),
+                '--jobs', str(args.jobs),
+                *(['--validate-only'] if args.validate_only else []),
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Микробенчмарк JSONRenderer DRF и api.renderers.JSONRenderer.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_json_renderer.py --rows 1000
+
+Кодирует страницы TitleReadSerializer и ReviewSerializer из временной
+базы обоими рендерерами и сравнивает время и результат.
+"""
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (setup_test_environment,  # noqa: E402
+                               teardown_test_environment)
+from rest_framework import renderers  # noqa: E402
+
+from api.renderers import JSONRenderer  # noqa: E402
+from api.serializers import ReviewSerializer, TitleReadSerializer  # noqa
+from reviews.models import (Category, Genre, GenreTitle, Review,  # noqa
+                            Title)
+from user.models import User  # noqa: E402
+
+
+def fill(rows):
+    Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(10)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(10)
+    )
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    genre_ids = list(Genre.objects.values_list('id', flat=True))
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {i}',
+            year=2000,
+            description='Описание произведения «в кавычках» ' * 3,
+            category_id=category_ids[i % len(category_ids)],
+            rating=i % 10 + 0.5,
+        )
+        for i in range(rows)
+    )
+    title_ids = list(Title.objects.values_list('id', flat=True))
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title_id=title_id, genre_id=genre_ids[title_id % 10])
+        for title_id in title_ids
+    )
+    User.objects.bulk_create(
+        User(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(rows)
+    )
+    Review.objects.bulk_create(
+        Review(
+            author_id=user_id,
+            title_id=title_ids[0],
+            text='Текст отзыва, достаточно длинный для типичной страницы. '
+                 * 4,
+            score=user_id % 10 + 1,
+        )
+        for user_id in User.objects.values_list('id', flat=True)
+    )
+
+
+def payloads(rows):
+    titles = Title.objects.select_related('category').prefetch_related(
+        'genre',
+    )[:rows]
+    reviews = Review.objects.select_related('author', 'title')[:rows]
+    return {
+        'TitleReadSerializer': TitleReadSerializer(titles, many=True).data,
+        'ReviewSerializer': ReviewSerializer(reviews, many=True).data,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        fill(args.rows)
+        data = payloads(args.rows)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    candidates = (
+        ('rest_framework', renderers.JSONRenderer()),
+        ('api.renderers', JSONRenderer()),
+    )
+    for name, payload in data.items():
+        outputs = {}
+        print(f'{name}, {len(payload)} объектов, '
+              f'{args.number} повторов:')
+        for label, renderer in candidates:
+            seconds = min(timeit.repeat(
+                lambda: renderer.render(payload),
+                number=args.number, repeat=3,
+            )) / args.number
+            outputs[label] = renderer.render(payload)
+            print(f'  {label:15} {seconds * 1000:8.2f} мс')
+        assert len(set(outputs.values())) == 1, 'Вывод различается'
+
+
+if __name__ == '__main__':
+    main()
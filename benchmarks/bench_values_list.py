@@ -0,0 +1,106 @@
+"""Сравнение обычной сериализации списка произведений и values_list.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_values_list.py --titles 5000 --limit 1000
+
+Создаёт временную базу, наполняет её произведениями с категориями
+и жанрами и замеряет GET /api/v1/titles/?limit=N в обоих режимах.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (setup_test_environment,  # noqa: E402
+                               teardown_test_environment)
+from rest_framework.test import APIClient  # noqa: E402
+
+from api.views import TitleViewSet  # noqa: E402
+from reviews.models import Category, Genre, GenreTitle, Title  # noqa: E402
+from user.models import User  # noqa: E402
+
+
+def fill(titles):
+    Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(20)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(30)
+    )
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    genre_ids = list(Genre.objects.values_list('id', flat=True))
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {i:06}',
+            year=1900 + i % 120,
+            description='Описание произведения ' * 5,
+            category_id=category_ids[i % len(category_ids)],
+        )
+        for i in range(titles)
+    )
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title_id=title_id, genre_id=genre_ids[(title_id + k) % 30])
+        for title_id in Title.objects.values_list('id', flat=True)
+        for k in range(title_id % 3 + 1)
+    )
+
+
+def measure(client, url, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.status_code
+    timings.sort()
+    return timings[len(timings) // 2], response.content
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        fill(args.titles)
+        client = APIClient()
+        # Ответы анонимным пользователям кешируются, поэтому
+        # запросы выполняются от имени пользователя.
+        client.force_authenticate(
+            User.objects.create(username='bench', email='bench@yamdb.fake')
+        )
+        url = f'/api/v1/titles/?limit={args.limit}'
+
+        results = {}
+        for enabled in (False, True):
+            TitleViewSet.values_list_enabled = enabled
+            results[enabled] = measure(client, url, args.repeat)
+        regular, fast = results[False], results[True]
+        assert regular[1] == fast[1], 'Ответы различаются'
+        print(f'Страница {args.limit} из {args.titles} произведений, '
+              f'медиана {args.repeat} запросов:')
+        print(f'  ModelSerializer: {regular[0] * 1000:8.1f} мс')
+        print(f'  values_list:     {fast[0] * 1000:8.1f} мс')
+        print(f'  ускорение:       {regular[0] / fast[0]:8.2f}x')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == '__main__':
+    main()
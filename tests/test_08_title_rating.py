@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_title(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            user_client, title_id, 'Неплохо', 4
+        ).json()
+        create_single_review(moderator_client, title_id, 'Отлично', 10)
+        assert self.get_title(client, title_id)['rating'] == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        response = user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_title(client, title_id)['rating'] == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        response = user_client.delete(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_title(client, title_id)['rating'] == 10, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+    def test_02_rating_after_author_deleted(self, client, admin_client,
+                                            user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Неплохо', 4)
+        assert self.get_title(client, title_id)['rating'] == 4
+
+        response = admin_client.delete('/api/v1/users/TestUser/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_title(client, title_id)['rating'] is None, (
+            'Проверьте, что рейтинг произведения сбрасывается, когда '
+            'удалены все отзывы на него.'
+        )
+
+    def test_03_rating_distribution(self, client, admin_client, user_client,
+                                    moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/rating-distribution/'
+        create_single_review(admin_client, title_id, 'Слабо', 2)
+        review = create_single_review(
+            user_client, title_id, 'Неплохо', 4
+        ).json()
+        create_single_review(moderator_client, title_id, 'Отлично', 10)
+        user_client.patch(
+            f'/api/v1/titles/{title_id}/reviews/{review["id"]}/',
+            data={'score': 9}
+        )
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{url}` возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'2': 1, '9': 1, '10': 1})
+        assert data['distribution'] == expected, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'количество отзывов для каждой оценки.'
+        )
+        assert data['review_count'] == 3
+        assert data['rating'] == 7
+        assert data['median'] == 9
+        assert data['percentiles']['25'] == 2
+
+        response = client.get('/api/v1/titles/999/rating-distribution/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
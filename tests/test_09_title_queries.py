@@ -0,0 +1,57 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+@pytest.fixture
+def many_titles():
+    Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(5)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(5)
+    )
+    categories = list(Category.objects.all())
+    genres = list(Genre.objects.all())
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {i:04}',
+            year=2000,
+            category=categories[i % len(categories)],
+        )
+        for i in range(1000)
+    )
+    GenreTitle.objects.bulk_create(
+        GenreTitle(title_id=title_id, genre=genres[title_id % len(genres)])
+        for title_id in Title.objects.values_list('id', flat=True)
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    @pytest.mark.parametrize('limit', (10, 100, 1000))
+    def test_01_title_list_query_count(self, client, many_titles, limit,
+                                       django_assert_num_queries):
+        url = f'/api/v1/titles/?limit={limit}'
+        with django_assert_num_queries(4):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == limit
+        assert all(
+            title['category'] and title['genre'] for title in results
+        ), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'категорию и жанры произведений.'
+        )
+
+    def test_02_title_detail_query_count(self, client, many_titles,
+                                         django_assert_num_queries):
+        title = Title.objects.first()
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,95 @@
+import json
+from base64 import urlsafe_b64encode
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10KeysetPagination:
+
+    def walk(self, client, url):
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data
+            pages.append(data)
+            url = data['next']
+        return pages
+
+    def test_01_titles_cursor(self, client):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i % 7}', year=2000) for i in range(25)
+        )
+        expected = list(
+            Title.objects.order_by('name', 'id').values_list('id', flat=True)
+        )
+        pages = self.walk(client, '/api/v1/titles/?cursor=&limit=10')
+        assert [len(page['results']) for page in pages] == [10, 10, 5], (
+            'Проверьте, что в режиме `?cursor=` эндпоинт `/api/v1/titles/` '
+            'отдаёт страницы размера `limit`.'
+        )
+        assert [
+            title['id'] for page in pages for title in page['results']
+        ] == expected, (
+            'Проверьте, что в режиме `?cursor=` произведения идут '
+            'по названию без пропусков и повторов.'
+        )
+        assert pages[0]['previous'] is None
+
+        response = client.get(pages[-1]['previous'])
+        assert [
+            title['id'] for title in response.json()['results']
+        ] == expected[10:20], (
+            'Проверьте, что ссылка `previous` в режиме `?cursor=` ведёт '
+            'на предыдущую страницу.'
+        )
+
+    def test_02_reviews_cursor(self, client, admin_client, admin, user,
+                               moderator):
+        title = Title.objects.create(name='Фильм', year=2000)
+        for author in (admin, user, moderator):
+            Review.objects.create(
+                author=author, title=title, text='Отзыв', score=5
+            )
+        url = f'/api/v1/titles/{title.id}/reviews/?cursor=&limit=2'
+        pages = self.walk(client, url)
+        assert [
+            review['id'] for page in pages for review in page['results']
+        ] == list(
+            title.reviews.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+
+        response = client.get(
+            f'/api/v1/titles/{title.id}/reviews/?cursor=broken'
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    @pytest.mark.parametrize('url, position', (
+        ('/api/v1/titles/', [None, 1]),
+        ('/api/v1/titles/', ['x', 'abc']),
+        ('/api/v1/titles/', ['x', [1]]),
+        ('/api/v1/titles/', ['x', True]),
+        ('/api/v1/titles/', ['x']),
+        ('/api/v1/titles/', {'name': 'x'}),
+        ('/api/v1/titles/{id}/reviews/', ['notadate', 1]),
+        ('/api/v1/titles/{id}/reviews/', ['2020-13-01T00:00:00', 1]),
+    ))
+    def test_03_tampered_cursor(self, client, url, position):
+        title = Title.objects.create(name='Фильм', year=2000)
+        cursor = urlsafe_b64encode(
+            json.dumps({'p': position, 'r': 0}).encode()
+        ).decode()
+        response = client.get(
+            url.format(id=title.id), {'cursor': cursor}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что подделанный курсор возвращает ответ '
+            'со статусом 404.'
+        )
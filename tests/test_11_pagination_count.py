@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.pagination import LimitOffsetOrKeysetPagination
+from reviews.models import Comments, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11PaginationCount:
+
+    def test_01_count_is_capped(self, client, monkeypatch):
+        monkeypatch.setattr(LimitOffsetOrKeysetPagination, 'count_limit', 5)
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i}', year=2000) for i in range(8)
+        )
+        data = client.get('/api/v1/titles/?limit=3').json()
+        assert data['count'] is None, (
+            'Проверьте, что при количестве объектов больше порога '
+            'поле `count` равно null.'
+        )
+        assert data['next'] and len(data['results']) == 3
+
+        data = client.get('/api/v1/titles/?limit=3&offset=6').json()
+        assert data['next'] is None and len(data['results']) == 2
+
+        data = client.get('/api/v1/titles/?limit=3&count=exact').json()
+        assert data['count'] == 8, (
+            'Проверьте, что с параметром `count=exact` поле `count` '
+            'содержит точное количество объектов.'
+        )
+
+        data = client.get('/api/v1/titles/?limit=3&year=1999').json()
+        assert data['count'] == 0 and data['results'] == []
+
+    def test_02_nested_lists_use_counters(self, client, admin, user):
+        title = Title.objects.create(name='Фильм', year=2000)
+        review = Review.objects.create(
+            author=admin, title=title, text='Отзыв', score=5
+        )
+        Review.objects.create(author=user, title=title, text='Ещё', score=7)
+        for author in (admin, user, admin):
+            Comments.objects.create(
+                author=author, review=review, text='Комментарий'
+            )
+        Comments.objects.filter(author=user).delete()
+
+        for url, expected in (
+            (f'/api/v1/titles/{title.id}/reviews/', 2),
+            (f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/', 2),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.json()['count'] == expected
+            assert not any(
+                'COUNT(' in query['sql'] for query in queries
+            ), (
+                f'Проверьте, что для `{url}` количество объектов берётся '
+                'из счётчика, а не из COUNT(*).'
+            )
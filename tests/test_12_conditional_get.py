@@ -0,0 +1,128 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ConditionalGet:
+
+    def test_01_etag_and_last_modified(self, client, admin_client, admin,
+                                       user, user_client):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+        assert etag and last_modified, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки ETag и Last-Modified.'
+        )
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            'If-None-Match возвращает ответ со статусом 304.'
+        )
+        assert not response.content
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        response = client.get(url + '?limit=1', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+        user_client.post(url, data={'text': 'Новый отзыв', 'score': 3})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после записи в `{url}` старый ETag '
+            'перестаёт совпадать.'
+        )
+        assert response.json()['count'] == 2
+
+    def test_02_title_etag_follows_category(self, client, admin_client):
+        create_reviews(admin_client, {})
+        url = '/api/v1/categories/'
+        etag = client.get(url)['ETag']
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.NOT_MODIFIED
+        titles_etag = client.get('/api/v1/titles/')['ETag']
+
+        admin_client.delete('/api/v1/categories/films/')
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == HTTPStatus.OK
+        assert client.get(
+            '/api/v1/titles/', HTTP_IF_NONE_MATCH=titles_etag
+        ).status_code == HTTPStatus.OK
+
+    def test_03_anonymous_response_cache(self, client, admin_client,
+                                         django_assert_num_queries):
+        create_reviews(admin_client, {})
+        url = '/api/v1/titles/'
+        expected = client.get(url).json()
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == expected, (
+            f'Проверьте, что повторный GET-запрос к `{url}` отдаётся из '
+            'кеша без запросов к произведениям.'
+        )
+
+        with django_assert_num_queries(5):
+            admin_client.get(url)
+
+        admin_client.patch('/api/v1/titles/{}/'.format(
+            expected['results'][0]['id']
+        ), data={'name': 'Новое название'})
+        names = [title['name'] for title in client.get(url).json()['results']]
+        assert 'Новое название' in names, (
+            'Проверьте, что кеш ответов сбрасывается после записи.'
+        )
+
+    def test_04_cached_headers_and_html(self, client, admin_client,
+                                        django_assert_num_queries):
+        create_reviews(admin_client, {})
+        url = '/api/v1/titles/'
+        expected = client.get(url)
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        for header in ('Content-Type', 'Vary', 'Allow'):
+            assert response[header] == expected[header], (
+                f'Проверьте, что ответ из кеша сохраняет заголовок {header}.'
+            )
+
+        client.get(url, HTTP_ACCEPT='text/html')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_ACCEPT='text/html')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/html')
+        assert len(context) > 1, (
+            'Проверьте, что HTML Browsable API с CSRF-токеном не '
+            'кешируется.'
+        )
+
+    def test_05_cache_depends_on_host_and_scheme(self, client):
+        for slug in ('books', 'films'):
+            Category.objects.create(name=slug, slug=slug)
+        url = '/api/v1/categories/?limit=1'
+        etags = set()
+        for host, secure in (('a.example', False), ('b.example', False),
+                             ('a.example', True)):
+            response = client.get(url, HTTP_HOST=host, secure=secure)
+            scheme = 'https' if secure else 'http'
+            assert response.json()['next'].startswith(
+                f'{scheme}://{host}/'
+            ), (
+                'Проверьте, что закешированный ответ не отдаёт ссылки '
+                'с чужим хостом или схемой.'
+            )
+            etags.add(response['ETag'])
+        assert len(etags) == 3
@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from reviews.models import Title
+from reviews.search import FTS_TABLE, search_enabled
+
+
+@pytest.fixture
+def titles_for_search():
+    Title.objects.create(
+        name='Побег из Шоушенка', year=1994,
+        description='Банкир попадает в тюрьму и планирует побег.'
+    )
+    Title.objects.create(
+        name='Зелёная миля', year=1999,
+        description='Надзиратели тюрьмы и необычный заключённый.'
+    )
+    Title.objects.create(
+        name='Крёстный отец', year=1972, description='Семейная сага.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleSearch:
+    url = '/api/v1/titles/'
+
+    def search(self, client, text):
+        response = client.get(self.url, {'search': text})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_name_and_description(self, client,
+                                               titles_for_search):
+        assert self.search(client, 'побег') == ['Побег из Шоушенка'], (
+            f'Проверьте, что `{self.url}?search=` ищет произведения по '
+            'названию и описанию и сначала отдаёт самые релевантные.'
+        )
+        assert set(self.search(client, 'тюрьм')) == {
+            'Побег из Шоушенка', 'Зелёная миля'
+        }, (
+            f'Проверьте, что `{self.url}?search=` находит слова по началу.'
+        )
+        assert self.search(client, 'сага семейная') == ['Крёстный отец']
+        assert self.search(client, '"') == []
+
+    def test_02_index_follows_updates(self, client, titles_for_search):
+        title = Title.objects.get(name='Крёстный отец')
+        title.description = 'История мафиозного клана.'
+        title.save()
+        assert self.search(client, 'мафиозного') == ['Крёстный отец']
+        assert self.search(client, 'сага') == []
+        title.delete()
+        assert self.search(client, 'мафиозного') == []
+
+    def test_03_fallback_without_fts(self, client, titles_for_search,
+                                     monkeypatch):
+        monkeypatch.setattr(connection, 'title_search_enabled', False,
+                            raising=False)
+        assert self.search(client, 'Зелёная') == ['Зелёная миля'], (
+            f'Проверьте, что без FTS5 `{self.url}?search=` ищет подстроку.'
+        )
+
+    def test_04_rebuild_search_index(self, client, titles_for_search,
+                                     capsys):
+        if not search_enabled():
+            pytest.skip('SQLite собран без FTS5')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')"
+            )
+        assert self.search(client, 'тюрьм') == []
+
+        call_command('rebuild_search_index')
+        assert 'пересоздан' in capsys.readouterr().out
+        assert set(self.search(client, 'тюрьм')) == {
+            'Побег из Шоушенка', 'Зелёная миля'
+        }, (
+            'Проверьте, что rebuild_search_index заново заполняет '
+            'полнотекстовый индекс.'
+        )
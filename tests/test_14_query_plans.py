@@ -0,0 +1,125 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comments, Genre, Review, Title
+from reviews.search import search_enabled
+
+BIG_TABLES = (
+    'reviews_title', 'reviews_review', 'reviews_comments',
+    'reviews_genretitle', 'reviews_titleleaderboard', 'user_user',
+)
+
+
+@pytest.fixture
+def dataset(admin, user):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(name='Фильм', year=2000, category=category)
+    title.genre.add(genre)
+    review = Review.objects.create(
+        author=admin, title=title, text='Отзыв', score=5
+    )
+    for author in (admin, user):
+        Comments.objects.create(author=author, review=review, text='Да')
+    return title, review
+
+
+def get_endpoints(title, review):
+    return (
+        ('/api/v1/titles/', 'reviews_title'),
+        ('/api/v1/titles/?year=2000', 'reviews_title'),
+        ('/api/v1/titles/?category=films', 'reviews_title'),
+        ('/api/v1/titles/?cursor=', 'reviews_title'),
+        ('/api/v1/titles/?ordering=-rating', 'reviews_title'),
+        ('/api/v1/titles/?ordering=year', 'reviews_title'),
+        ('/api/v1/titles/?ordering=-review_count', 'reviews_title'),
+        ('/api/v1/titles/?rating_min=5&ordering=-rating', 'reviews_title'),
+        ('/api/v1/titles/top/', 'reviews_titleleaderboard'),
+        ('/api/v1/titles/top/?genre=drama&category=films',
+         'reviews_titleleaderboard'),
+        (f'/api/v1/titles/{title.id}/reviews/', 'reviews_review'),
+        (f'/api/v1/titles/{title.id}/reviews/?cursor=', 'reviews_review'),
+        (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+            'reviews_comments'
+        ),
+        (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+            '?cursor=',
+            'reviews_comments'
+        ),
+        ('/api/v1/categories/', 'reviews_category'),
+        ('/api/v1/genres/', 'reviews_genre'),
+        ('/api/v1/users/', 'user_user'),
+    )
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14QueryPlans:
+
+    def test_01_list_queries_use_indexes(self, admin_client, dataset):
+        for url, table in get_endpoints(*dataset):
+            with CaptureQueriesContext(connection) as queries:
+                response = admin_client.get(url)
+            assert response.status_code == 200, url
+            main_queries = [
+                query['sql'] for query in queries
+                if f'FROM "{table}"' in query['sql']
+                and 'ORDER BY' in query['sql']
+                and 'COUNT(' not in query['sql']
+            ]
+            assert main_queries, f'Не найден основной запрос для `{url}`.'
+            for sql in main_queries:
+                plan = explain(sql)
+                assert not any('USE TEMP B-TREE' in row for row in plan), (
+                    f'Основной запрос `{url}` сортирует строки без индекса: '
+                    f'{plan}'
+                )
+                full_scans = [
+                    row for row in plan
+                    if row.startswith('SCAN ') and 'USING' not in row
+                    and row.split()[1] in BIG_TABLES
+                ]
+                assert not full_scans, (
+                    f'Основной запрос `{url}` читает таблицу целиком: '
+                    f'{plan}'
+                )
+
+    def test_02_search_joins_index_once(self, client, dataset):
+        if not search_enabled():
+            pytest.skip('SQLite собран без FTS5')
+        Title.objects.bulk_create(
+            Title(name=f'Дом {number}', year=2000) for number in range(300)
+        )
+        url = '/api/v1/titles/?search=дом&limit=10'
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 10
+        fts_queries = [
+            query['sql'] for query in queries
+            if 'reviews_title_fts' in query['sql']
+        ]
+        main_queries = [sql for sql in fts_queries if 'ORDER BY' in sql]
+        assert len(main_queries) == 1, fts_queries
+        plan = explain(main_queries[0])
+        assert not any('CORRELATED' in row for row in plan), (
+            f'Проверьте, что `{url}` не выполняет подзапрос к индексу '
+            f'на каждую строку: {plan}'
+        )
+        assert any(
+            'reviews_title_fts VIRTUAL TABLE INDEX' in row for row in plan
+        )
+        assert any(
+            'reviews_title USING INTEGER PRIMARY KEY' in row for row in plan
+        ), f'Проверьте, что индекс присоединяется по rowid: {plan}'
+        assert not any(
+            'rank' in sql for sql in fts_queries if 'COUNT(' in sql
+        ), 'Проверьте, что подсчёт строк поиска не сортирует по rank.'
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Review, Title
+
+
+@pytest.fixture
+def rated_titles(admin, user, moderator):
+    scores = {
+        ('Терминатор', 1984): (10, 8),
+        ('Чужой', 1979): (6,),
+        ('Матрица', 1999): (9, 9, 9),
+        ('Аватар', 2009): (),
+    }
+    authors = (admin, user, moderator)
+    for (name, year), title_scores in scores.items():
+        title = Title.objects.create(name=name, year=year)
+        for author, score in zip(authors, title_scores):
+            Review.objects.create(
+                author=author, title=title, text='Отзыв', score=score
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleOrdering:
+    url = '/api/v1/titles/'
+
+    def names(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_ordering(self, client, rated_titles):
+        assert self.names(client, ordering='-rating') == [
+            'Матрица', 'Терминатор', 'Чужой', 'Аватар'
+        ], (
+            f'Проверьте, что `{self.url}?ordering=-rating` сортирует '
+            'произведения по убыванию рейтинга.'
+        )
+        assert self.names(client, ordering='year') == [
+            'Чужой', 'Терминатор', 'Матрица', 'Аватар'
+        ]
+        assert self.names(client, ordering='-review_count,name') == [
+            'Матрица', 'Терминатор', 'Чужой', 'Аватар'
+        ]
+
+    def test_02_range_filters(self, client, rated_titles):
+        assert self.names(
+            client, rating_min=8, ordering='-rating'
+        ) == ['Матрица', 'Терминатор'], (
+            f'Проверьте, что `{self.url}` фильтрует произведения '
+            'по `rating_min`.'
+        )
+        assert self.names(client, rating_max=7) == ['Чужой']
+        assert self.names(
+            client, year_min=1980, year_max=2000
+        ) == ['Матрица', 'Терминатор'], (
+            f'Проверьте, что `{self.url}` фильтрует произведения '
+            'по `year_min` и `year_max`.'
+        )
+
+    def test_03_cursor_with_ordering(self, client, rated_titles):
+        for params in ({'ordering': '-rating'}, {'search': 'Матрица'}):
+            response = client.get(self.url, {'cursor': '', **params})
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{self.url}?cursor=` вместе с {params} '
+                'возвращает ответ со статусом 400.'
+            )
+            assert 'cursor' in response.json()
+        assert self.names(client, cursor='', rating_min=8) == [
+            'Матрица', 'Терминатор'
+        ], 'Проверьте, что фильтры совместимы с `?cursor=`.'
@@ -0,0 +1,144 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import (Category, Genre, Review, Title,
+                            TitleLeaderboard)
+
+
+@pytest.fixture
+def leaderboard_titles(settings, admin, user, moderator):
+    settings.LEADERBOARD_MIN_REVIEWS = 2
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    catalogue = {
+        'Терминатор': (movie, (drama,), (10, 8)),
+        'Чужой': (movie, (drama, comedy), (6, 5)),
+        'Матрица': (movie, (comedy,), (9, 9, 9)),
+        'Война и мир': (book, (drama,), (7, 8)),
+        'Аватар': (movie, (drama,), (10,)),
+    }
+    authors = (admin, user, moderator)
+    titles = {}
+    for name, (category, genres, scores) in catalogue.items():
+        title = Title.objects.create(name=name, year=2000, category=category)
+        title.genre.set(genres)
+        for author, score in zip(authors, scores):
+            Review.objects.create(
+                author=author, title=title, text='Отзыв', score=score
+            )
+        titles[name] = title
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16TitleLeaderboard:
+    url = '/api/v1/titles/top/'
+
+    def names(self, client, **params):
+        response = client.get(self.url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` возвращает ответ '
+            'со статусом 200.'
+        )
+        return [title['name'] for title in response.json()]
+
+    def test_01_top(self, client, leaderboard_titles):
+        assert self.names(client) == [
+            'Матрица', 'Терминатор', 'Война и мир', 'Чужой'
+        ], (
+            f'Проверьте, что `{self.url}` возвращает произведения '
+            'по убыванию рейтинга без произведений с малым числом отзывов.'
+        )
+        assert self.names(client, genre='drama') == [
+            'Терминатор', 'Война и мир', 'Чужой'
+        ], (
+            f'Проверьте, что `{self.url}?genre=` возвращает топ жанра.'
+        )
+        assert self.names(client, category='book') == ['Война и мир']
+        assert self.names(client, genre='comedy', category='movie') == [
+            'Матрица', 'Чужой'
+        ]
+        assert self.names(client, n=2) == ['Матрица', 'Терминатор']
+
+        response = client.get(self.url)
+        title = response.json()[0]
+        assert title['rating'] == 9
+        assert title['category'] == {'name': 'Фильм', 'slug': 'movie'}
+        assert title['genre'] == [{'name': 'Комедия', 'slug': 'comedy'}]
+
+    def test_02_bad_params(self, client, leaderboard_titles):
+        for params in ({'genre': 'unknown'}, {'n': 0}, {'n': 'many'},
+                       {'n': 1000}):
+            response = client.get(self.url, params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что `{self.url}` возвращает ответ со статусом '
+                f'400 для некорректных параметров {params}.'
+            )
+
+    def test_03_follows_reviews(self, client, user, leaderboard_titles):
+        avatar = leaderboard_titles['Аватар']
+        Review.objects.create(
+            author=user, title=avatar, text='Отзыв', score=8
+        )
+        assert 'Аватар' in self.names(client, genre='drama'), (
+            'Проверьте, что произведение попадает в топ, когда набирает '
+            'минимальное число отзывов.'
+        )
+
+        review = Review.objects.get(
+            title=leaderboard_titles['Чужой'], score=5
+        )
+        review.score = 10
+        review.save()
+        assert self.names(client, genre='drama') == [
+            'Терминатор', 'Аватар', 'Чужой', 'Война и мир'
+        ], (
+            'Проверьте, что топ обновляется при изменении оценки.'
+        )
+
+        review.delete()
+        assert 'Чужой' not in self.names(client), (
+            'Проверьте, что произведение убирается из топа, когда отзывов '
+            'становится меньше минимального числа.'
+        )
+
+    def test_04_follows_title_changes(self, admin_client, client,
+                                      leaderboard_titles):
+        title = leaderboard_titles['Терминатор']
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.id}/',
+            data={'genre': ['comedy'], 'category': 'book'},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert 'Терминатор' not in self.names(client, genre='drama'), (
+            'Проверьте, что топ жанра обновляется при изменении жанров '
+            'произведения.'
+        )
+        assert self.names(client, genre='comedy', category='book') == [
+            'Терминатор'
+        ]
+        assert self.names(client, category='book') == [
+            'Терминатор', 'Война и мир'
+        ]
+
+        response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not TitleLeaderboard.objects.filter(title=title).exists()
+
+        response = admin_client.delete('/api/v1/genres/drama/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.names(client) == ['Матрица', 'Война и мир', 'Чужой']
+
+    def test_05_queries_do_not_depend_on_catalogue(
+        self, client, leaderboard_titles, django_assert_num_queries
+    ):
+        # Версии данных, жанр по slug, n строк рейтинга,
+        # произведения с категориями и их жанры.
+        with django_assert_num_queries(5):
+            response = client.get(self.url, {'genre': 'drama', 'n': 2})
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()) == 2
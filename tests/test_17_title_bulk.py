@@ -0,0 +1,116 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+@pytest.fixture
+def catalogue():
+    Category.objects.create(name='Фильм', slug='movie')
+    Category.objects.create(name='Книга', slug='book')
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.create(name='Комедия', slug='comedy')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleBulk:
+    url = '/api/v1/titles/bulk/'
+
+    def test_01_bulk_create(self, admin_client, catalogue,
+                            django_assert_max_num_queries):
+        data = [
+            {
+                'name': f'Фильм {number}',
+                'year': 2000 + number % 20,
+                'category': 'movie' if number % 2 else 'book',
+                'genre': ['drama', 'comedy'][:number % 2 + 1],
+                'description': 'Описание',
+            }
+            for number in range(300)
+        ]
+        # Категории и жанры по запросу на модель, вставки пачками
+        # по ограничению SQLite на число параметров — не по запросу
+        # на произведение.
+        with django_assert_max_num_queries(20):
+            response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.url}` '
+            'с корректными данными возвращает ответ со статусом 201.'
+        )
+        results = response.json()
+        assert len(results) == len(data)
+        assert Title.objects.count() == len(data)
+        assert GenreTitle.objects.count() == 450
+
+        for item, result in zip(data, results):
+            title = Title.objects.get(pk=result['id'])
+            assert title.name == item['name'] == result['name'], (
+                'Проверьте, что в ответе на пакетное создание id '
+                'соответствуют созданным произведениям.'
+            )
+            assert title.category.slug == item['category']
+            assert sorted(
+                title.genre.values_list('slug', flat=True)
+            ) == sorted(item['genre'])
+
+        response = admin_client.get(f'/api/v1/titles/{results[1]["id"]}/')
+        assert response.json()['genre'] == [
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ]
+
+    def test_02_per_item_errors(self, admin_client, catalogue):
+        data = [
+            {'name': 'Терминатор', 'year': 1984, 'category': 'movie',
+             'genre': ['drama']},
+            {'name': 'Чужой', 'year': 1979, 'category': 'cartoon',
+             'genre': ['drama', 'horror']},
+            {'name': 'Матрица', 'year': 3000, 'category': 'movie',
+             'genre': ['drama']},
+            {'year': 1999, 'category': 'movie', 'genre': []},
+        ]
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS, (
+            f'Проверьте, что POST-запрос к `{self.url}` с частично '
+            'некорректными данными возвращает ответ со статусом 207.'
+        )
+        results = response.json()
+        assert results[0]['name'] == 'Терминатор'
+        assert set(results[1]['errors']) == {'category', 'genre'}, (
+            'Проверьте, что для неизвестных slug возвращаются ошибки '
+            'элемента.'
+        )
+        assert 'year' in results[2]['errors']
+        assert 'name' in results[3]['errors']
+        assert list(Title.objects.values_list('name', flat=True)) == [
+            'Терминатор'
+        ]
+
+        response = admin_client.post(self.url, data=data[1:], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert Title.objects.count() == 1
+
+    def test_03_bad_requests(self, admin_client, user_client, client,
+                             catalogue, settings):
+        item = {'name': 'Терминатор', 'year': 1984, 'category': 'movie',
+                'genre': ['drama']}
+        response = client.post(
+            self.url, data=json.dumps([item]), content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.post(self.url, data=[item], format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что пакетное создание через `{self.url}` '
+            'доступно только администратору.'
+        )
+        for data in (item, []):
+            response = admin_client.post(self.url, data=data, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        settings.TITLE_BULK_MAX_SIZE = 1
+        response = admin_client.post(
+            self.url, data=[item, item], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Title.objects.exists()
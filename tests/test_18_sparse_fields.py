@@ -0,0 +1,137 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Comments, Genre, Review, Title
+
+
+@pytest.fixture
+def dataset(admin, user):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genre = Genre.objects.create(name='Драма', slug='drama')
+    title = Title.objects.create(
+        name='Терминатор', year=1984, category=category,
+        description='Описание',
+    )
+    title.genre.add(genre)
+    review = Review.objects.create(
+        author=admin, title=title, text='Отзыв', score=8
+    )
+    Comments.objects.create(author=user, review=review, text='Согласен')
+    return title, review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18SparseFields:
+
+    def get(self, client, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` с параметрами {params} '
+            'возвращает ответ со статусом 200.'
+        )
+        return response.json(), [query['sql'] for query in queries]
+
+    def test_01_titles(self, client, dataset):
+        url = '/api/v1/titles/'
+        data, queries = self.get(client, url, fields='id,name,year,rating')
+        assert data['results'] == [
+            {'id': dataset[0].id, 'name': 'Терминатор', 'year': 1984,
+             'rating': 8}
+        ], (
+            f'Проверьте, что `{url}?fields=` возвращает только '
+            'перечисленные поля.'
+        )
+        title_queries = [sql for sql in queries if 'reviews_title"' in sql]
+        assert not any('reviews_category' in sql for sql in queries), (
+            f'Проверьте, что `{url}?fields=` без category не '
+            'присоединяет категории.'
+        )
+        assert not any('reviews_genre' in sql for sql in queries), (
+            f'Проверьте, что `{url}?fields=` без genre не загружает жанры.'
+        )
+        assert not any('description' in sql for sql in title_queries), (
+            f'Проверьте, что `{url}?fields=` загружает только нужные '
+            'колонки.'
+        )
+
+        data, _ = self.get(client, url, omit='description,genre')
+        assert set(data['results'][0]) == {
+            'id', 'category', 'rating', 'name', 'year'
+        }
+        assert data['results'][0]['category'] == {
+            'name': 'Фильм', 'slug': 'movie'
+        }, 'Проверьте, что ?omit= не влияет на вложенные объекты.'
+
+        data, _ = self.get(
+            client, f'{url}{dataset[0].id}/', fields='name,genre'
+        )
+        assert data == {'name': 'Терминатор',
+                        'genre': [{'name': 'Драма', 'slug': 'drama'}]}
+
+        data, _ = self.get(client, url, fields='name', cursor='')
+        assert data['results'] == [{'name': 'Терминатор'}]
+
+    def test_02_reviews_and_comments(self, client, dataset):
+        title, review = dataset
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        data, queries = self.get(client, url, fields='id,score')
+        assert data['results'] == [{'id': review.id, 'score': 8}]
+        review_queries = [sql for sql in queries if 'reviews_review"' in sql]
+        assert review_queries and not any(
+            '"text"' in sql or 'user_user' in sql for sql in review_queries
+        ), (
+            f'Проверьте, что `{url}?fields=` загружает только нужные '
+            'колонки отзывов и не присоединяет авторов.'
+        )
+
+        data, queries = self.get(client, f'{url}{review.id}/',
+                                 fields='id,author,title')
+        assert data == {'id': review.id, 'author': 'TestAdmin',
+                        'title': 'Терминатор'}
+        review_queries = [sql for sql in queries if 'reviews_review"' in sql]
+        assert len(review_queries) == 1
+        assert 'user_user' in review_queries[0]
+        assert '"score"' not in review_queries[0], (
+            'Проверьте, что ?fields= урезает колонки запроса отзыва.'
+        )
+
+        data, queries = self.get(client, f'{url}{review.id}/',
+                                 omit='text,title')
+        assert set(data) == {'id', 'author', 'score', 'pub_date'}
+        assert not any(
+            '"text"' in sql for sql in queries if 'reviews_review"' in sql
+        )
+
+        url = f'{url}{review.id}/comments/'
+        data, queries = self.get(client, url, fields='author,text')
+        assert data['results'] == [{'author': 'TestUser', 'text': 'Согласен'}]
+        comment_queries = [
+            sql for sql in queries if 'reviews_comments"' in sql
+        ]
+        assert comment_queries and not any(
+            'review_id' in sql.split('FROM')[0] for sql in comment_queries
+        ), (
+            f'Проверьте, что `{url}?fields=` загружает только нужные '
+            'колонки комментариев.'
+        )
+
+    def test_03_users(self, admin_client, dataset):
+        data, _ = self.get(admin_client, '/api/v1/users/', fields='username')
+        assert data['results'] == [
+            {'username': 'TestAdmin'}, {'username': 'TestUser'}
+        ]
+
+    def test_04_writes_ignore_fields(self, admin_client, dataset):
+        title, _ = dataset
+        response = admin_client.patch(
+            f'/api/v1/titles/{title.id}/?fields=id',
+            data={'name': 'Чужой'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['name'] == 'Чужой', (
+            'Проверьте, что ?fields= не меняет ответ на запросы записи.'
+        )
@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.mixins import ListModelMixin
+
+from api.views import CommentsViewSet, ReviewViewSet, TitleViewSet
+from reviews.models import Category, Comments, Genre, Review, Title
+
+
+@pytest.fixture
+def dataset(admin, user, moderator):
+    categories = [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(2)
+    ]
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    titles = []
+    for i in range(6):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=1990 + i,
+            description='Описание' if i % 2 else None,
+            category=categories[i % 2] if i < 5 else None,
+        )
+        title.genre.set(genres[:i % 4])
+        titles.append(title)
+    for author, score in ((admin, 7), (user, 10), (moderator, 4)):
+        review = Review.objects.create(
+            author=author, title=titles[0], text='Отзыв', score=score
+        )
+        Comments.objects.create(author=user, review=review, text='Да')
+        Comments.objects.create(author=admin, review=review, text='Нет')
+    return titles[0], review
+
+
+def get_urls(title, review):
+    titles = '/api/v1/titles/'
+    reviews = f'/api/v1/titles/{title.id}/reviews/'
+    comments = f'{reviews}{review.id}/comments/'
+    return (
+        titles,
+        f'{titles}?limit=3&offset=2',
+        f'{titles}?cursor=&limit=2',
+        f'{titles}?genre=genre-1&ordering=-year',
+        f'{titles}?search=Произведение',
+        f'{titles}?fields=id,genre',
+        f'{titles}?omit=category',
+        reviews,
+        f'{reviews}?cursor=&limit=1',
+        f'{reviews}?fields=pub_date,author',
+        comments,
+        f'{comments}?limit=1',
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ValuesListReads:
+
+    def test_01_same_json(self, admin_client, dataset, monkeypatch):
+        def model_list(*args, **kwargs):
+            raise AssertionError('Использована обычная сериализация.')
+
+        for url in get_urls(*dataset):
+            monkeypatch.setattr(ListModelMixin, 'list', model_list)
+            response = admin_client.get(url)
+            monkeypatch.undo()
+            assert response.status_code == HTTPStatus.OK, url
+            fast = response.content
+            for viewset in (TitleViewSet, ReviewViewSet, CommentsViewSet):
+                monkeypatch.setattr(viewset, 'values_list_enabled', False)
+            regular = admin_client.get(url).content
+            monkeypatch.undo()
+            assert fast == regular, (
+                f'Проверьте, что список `{url}` из values_list совпадает '
+                'с обычной сериализацией.'
+            )
+
+    def test_02_cursor_pages(self, client, dataset):
+        url = '/api/v1/titles/?cursor=&limit=4'
+        names = []
+        while url:
+            data = client.get(url).json()
+            names += [title['name'] for title in data['results']]
+            url = data['next']
+        assert names == [f'Произведение {i}' for i in range(6)], (
+            'Проверьте, что keyset-пагинация работает со строками '
+            'values_list.'
+        )
@@ -0,0 +1,109 @@
+import datetime
+import decimal
+import io
+import uuid
+from http import HTTPStatus
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from api import renderers as api_renderers
+from api.parsers import JSONParser
+from api.renderers import JSONRenderer
+
+PAYLOADS = (
+    {'count': 2, 'next': None, 'results': [{'id': 1, 'rating': None}]},
+    {'text': 'Отзыв «в кавычках» \\ / \n\t\x01\x7f    😀'},
+    {1: 'int key', 'none': None, 'bool': True, 'float': 0.5},
+    [datetime.datetime(2019, 9, 24, 21, 8, 21, 567891,
+                       tzinfo=datetime.timezone.utc),
+     datetime.date(2019, 9, 24), datetime.time(21, 8, 21, 567891),
+     datetime.timedelta(days=1, seconds=5)],
+    {'decimal': decimal.Decimal('1.50'), 'uuid': uuid.UUID(int=1)},
+    {'lazy': gettext_lazy('Not found.'), 'set': {3}, 'tuple': (1, 2)},
+    ReturnDict({'detail': ErrorDetail('Неверный код', code='invalid')},
+               serializer=None),
+    {'big': 2 ** 70, 'negative': -2 ** 65},
+    [],
+    'строка',
+)
+
+
+class TestJSONRenderer:
+
+    @pytest.mark.parametrize('payload', PAYLOADS)
+    def test_01_same_bytes(self, payload):
+        assert JSONRenderer().render(payload) == (
+            renderers.JSONRenderer().render(payload)
+        ), 'Проверьте, что JSONRenderer выводит те же байты, что и DRF.'
+
+    def test_02_indent_and_fallback(self, monkeypatch):
+        payload = {'name': 'Терминатор', 'genre': [{'slug': 'drama'}]}
+        for media_type, context in (
+            ('application/json; indent=2', None),
+            (None, {'indent': 4}),
+        ):
+            assert JSONRenderer().render(payload, media_type, context) == (
+                renderers.JSONRenderer().render(payload, media_type, context)
+            )
+        assert JSONRenderer().render(None) == b''
+        monkeypatch.setattr(api_renderers, 'orjson', None)
+        assert JSONRenderer().render(payload) == (
+            renderers.JSONRenderer().render(payload)
+        ), 'Проверьте, что без orjson используется стандартный json.'
+
+    def test_03_unsupported_type(self):
+        with pytest.raises(TypeError):
+            JSONRenderer().render({'object': object()})
+
+
+class TestJSONParser:
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(io.BytesIO(body), parser_context={
+            'encoding': encoding
+        })
+
+    @pytest.mark.parametrize('body', (
+        '{"name": "Терминатор", "genre": ["drama"], "year": 1984}',
+        '[1, 2.5, true, null, {"a": {"b": []}}]',
+        '{"big": 123456789012345678901234567890}',
+        '{"surrogate": "\\ud800"}',
+        '{"a": 1, "a": 2}',
+    ))
+    def test_01_same_data(self, body):
+        body = body.encode()
+        assert self.parse(JSONParser(), body) == (
+            self.parse(parsers.JSONParser(), body)
+        ), 'Проверьте, что JSONParser разбирает тело так же, как DRF.'
+
+    @pytest.mark.parametrize('body', ('{"a": ', 'NaN', '\ufeff{}'))
+    def test_02_same_errors(self, body):
+        body = body.encode()
+        with pytest.raises(ParseError) as error:
+            self.parse(JSONParser(), body)
+        with pytest.raises(ParseError) as expected:
+            self.parse(parsers.JSONParser(), body)
+        assert str(error.value) == str(expected.value)
+
+    def test_03_other_encoding(self):
+        body = '{"name": "Терминатор"}'.encode('utf-16')
+        assert self.parse(JSONParser(), body, 'utf-16') == {
+            'name': 'Терминатор'
+        }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_api_uses_renderer_and_parser(admin_client):
+    response = admin_client.post(
+        '/api/v1/genres/',
+        data='{"name": "Драма\\u2028Комедия", "slug": "drama"}'.encode(),
+        content_type='application/json',
+    )
+    assert response.status_code == HTTPStatus.CREATED
+    assert response.content == (
+        '{"name":"Драма\\u2028Комедия","slug":"drama"}'.encode()
+    ), 'Проверьте, что API использует JSONRenderer и JSONParser.'
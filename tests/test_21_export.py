@@ -0,0 +1,130 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Category, Comments, Genre, Review, Title
+
+
+@pytest.fixture
+def dataset(admin, user, moderator):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    titles = []
+    for i in range(5):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000 + i,
+            category=category if i % 2 else None,
+        )
+        title.genre.set((comedy, drama)[:i % 3])
+        titles.append(title)
+    reviews = [
+        Review.objects.create(
+            author=author, title=titles[0], text=f'Отзыв {author}',
+            score=score,
+        )
+        for author, score in ((admin, 5), (user, 7), (moderator, 9))
+    ]
+    for review in reviews:
+        Comments.objects.create(author=user, review=review, text='Да')
+    return titles, reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Export:
+    url = '/api/v1/export/{}.ndjson'
+
+    def export(self, client, resource, **params):
+        url = self.url.format(resource)
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос администратора к `{url}` '
+            'возвращает ответ со статусом 200.'
+        )
+        assert response.streaming, (
+            f'Проверьте, что `{url}` возвращает StreamingHttpResponse.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        content = b''.join(response.streaming_content).decode()
+        assert content == '' or content.endswith('\n')
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_01_titles(self, admin_client, dataset, settings):
+        settings.EXPORT_CHUNK_SIZE = 2
+        titles, _ = dataset
+        rows = self.export(admin_client, 'titles')
+        assert [row['id'] for row in rows] == [title.id for title in titles]
+        assert rows[1] == {
+            'id': titles[1].id, 'name': 'Произведение 1', 'year': 2001,
+            'description': None, 'category': 'movie', 'genre': ['comedy'],
+            'rating': None, 'review_count': 0,
+        }
+        assert rows[2]['genre'] == ['drama', 'comedy'], (
+            'Проверьте, что жанры произведения выгружаются по названию.'
+        )
+        assert rows[0]['rating'] == 7
+
+        rows = self.export(admin_client, 'titles', after=titles[2].id)
+        assert [row['id'] for row in rows] == [
+            title.id for title in titles[3:]
+        ], 'Проверьте, что параметр after продолжает выгрузку.'
+
+    def test_02_reviews_and_comments(self, admin_client, dataset, settings):
+        settings.EXPORT_CHUNK_SIZE = 2
+        titles, reviews = dataset
+        rows = self.export(admin_client, 'reviews')
+        assert [row['id'] for row in rows] == [
+            review.id for review in reviews
+        ]
+        assert rows[0]['title'] == titles[0].id
+        assert rows[0]['author'] == 'TestAdmin'
+        assert rows[0]['comment_count'] == 1
+        response = admin_client.get(
+            f'/api/v1/titles/{titles[0].id}/reviews/{reviews[0].id}/'
+        )
+        assert rows[0]['pub_date'] == response.json()['pub_date'], (
+            'Проверьте, что дата публикации выгружается в формате API.'
+        )
+
+        rows = self.export(admin_client, 'comments')
+        assert len(rows) == 3
+        assert rows[0]['review'] == reviews[0].id
+        assert rows[0]['title'] == titles[0].id
+        assert rows[0]['author'] == 'TestUser'
+
+    def test_03_since(self, admin_client, dataset):
+        _, reviews = dataset
+        moment = timezone.now()
+        Review.objects.filter(pk=reviews[0].pk).update(
+            pub_date=moment - timezone.timedelta(days=1)
+        )
+        since = (moment - timezone.timedelta(hours=1)).isoformat()
+        rows = self.export(admin_client, 'reviews', since=since)
+        assert [row['id'] for row in rows] == [
+            review.id for review in reviews[1:]
+        ], 'Проверьте, что параметр since отбирает новые отзывы.'
+        assert self.export(
+            admin_client, 'comments', since=moment.isoformat()
+        ) == []
+
+        response = admin_client.get(
+            self.url.format('titles'), {'since': since}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.get(
+            self.url.format('reviews'), {'since': 'вчера'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_permissions(self, client, user_client, moderator_client,
+                            admin_client, dataset):
+        url = self.url.format('titles')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        for other_client in (user_client, moderator_client):
+            assert other_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что `{url}` доступен только администратору.'
+            )
+        response = admin_client.get(self.url.format('users'))
+        assert response.status_code == HTTPStatus.NOT_FOUND
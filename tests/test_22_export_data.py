@@ -0,0 +1,86 @@
+import csv
+import datetime
+import gzip
+import re
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Review
+
+FILES = (
+    'users', 'genre', 'category', 'titles', 'genre_title', 'review',
+    'comments',
+)
+SEED_DIR = settings.BASE_DIR / 'static/data'
+PUB_DATE = re.compile(r'^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z$')
+
+
+def read_rows(path):
+    opener = gzip.open if path.suffix == '.gz' else open
+    with opener(path, 'rt', encoding='utf8', newline='') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ExportData:
+
+    def export(self, path, *args):
+        call_command('export_data', '--path', str(path), *args, stdout=None)
+
+    def test_01_seed_round_trip(self, tmp_path):
+        call_command('import_data')
+        self.export(tmp_path)
+        for name in FILES:
+            seed = read_rows(SEED_DIR / f'{name}.csv')
+            exported = read_rows(tmp_path / f'{name}.csv')
+            assert [list(row) for row in exported[:1]] == [
+                list(row) for row in seed[:1]
+            ], f'Проверьте колонки файла `{name}.csv`.'
+            for row in exported:
+                if 'pub_date' in row:
+                    assert PUB_DATE.match(row['pub_date'])
+            seed.sort(key=lambda row: int(row['id']))
+            assert exported == seed, (
+                f'Проверьте, что `{name}.csv` совпадает с исходными данными.'
+            )
+        assert not list(tmp_path.glob('*.partial'))
+        assert b'\r' not in (tmp_path / 'users.csv').read_bytes(), (
+            'Проверьте, что строки CSV разделяются \\n, как в static/data.'
+        )
+
+    def test_02_pub_date_format(self, tmp_path, django_user_model):
+        call_command('import_data')
+        django_user_model.objects.create(
+            username='exporter', email='exporter@yamdb.fake',
+        )
+        Review.objects.filter(pk=1).update(pub_date=datetime.datetime(
+            2019, 9, 24, 21, 8, 21, 567891, tzinfo=datetime.timezone.utc,
+        ))
+        self.export(tmp_path, '--chunk-size', '7')
+        review = read_rows(tmp_path / 'review.csv')[0]
+        assert review['pub_date'] == '2019-09-24T21:08:21.567Z', (
+            'Проверьте, что дата выгружается в формате static/data.'
+        )
+        users = read_rows(tmp_path / 'users.csv')
+        assert users[-1]['username'] == 'exporter'
+
+    def test_03_compress_and_jobs(self, tmp_path):
+        call_command('import_data')
+        self.export(tmp_path / 'plain')
+        self.export(tmp_path / 'gzip', '--compress', '--jobs', '3')
+        for name in FILES:
+            assert gzip.decompress(
+                (tmp_path / 'gzip' / f'{name}.csv.gz').read_bytes()
+            ) == (tmp_path / 'plain' / f'{name}.csv').read_bytes(), (
+                'Проверьте, что --compress и --jobs не меняют содержимое.'
+            )
+
+    def test_04_invalid_options(self, tmp_path):
+        with pytest.raises(CommandError, match='--path'):
+            call_command('export_data')
+        for option in ('--jobs', '--chunk-size'):
+            with pytest.raises(CommandError):
+                self.export(tmp_path, option, '0')
@@ -0,0 +1,83 @@
+import shutil
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import (Comments, Review, Title, TitleLeaderboard,
+                            TitleScoreCount)
+from reviews.versions import get_versions
+from user.models import User
+
+SEED_DIR = settings.BASE_DIR / 'static/data'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23ImportData:
+
+    def test_01_bulk_import(self, capsys):
+        with CaptureQueriesContext(connection) as context:
+            call_command('import_data', '--batch-size', '50')
+        assert len(context.captured_queries) < 100, (
+            'Проверьте, что import_data загружает строки пакетами, '
+            'а не запросом на каждую строку.'
+        )
+        assert User.objects.count() == 5
+        assert Review.objects.count() == 72
+        assert Comments.objects.count() == 3
+        output = capsys.readouterr().out
+        assert 'строк/с' in output, (
+            'Проверьте, что import_data сообщает скорость загрузки.'
+        )
+
+        review = Review.objects.get(pk=1)
+        assert review.author_id == 100
+        assert review.pub_date.isoformat() == (
+            '2019-09-24T21:08:21.567000+00:00'
+        ), (
+            'Проверьте, что дата публикации берётся из файла.'
+        )
+        title = Title.objects.get(pk=13)
+        assert (title.review_count, title.score_sum) == (3, 11), (
+            'Проверьте, что после загрузки пересчитываются рейтинги.'
+        )
+        assert title.rating == pytest.approx(11 / 3)
+        assert TitleScoreCount.objects.filter(title=title).exists()
+        assert TitleLeaderboard.objects.filter(title=title).count() > 1
+        assert Review.objects.get(pk=6).comment_count == 3
+        versions = get_versions(('title', 'user', 'genre', 'category'))
+        assert len(versions) == 4, (
+            'Проверьте, что после загрузки увеличиваются версии данных.'
+        )
+
+        call_command('import_data')
+        assert 'уже загружены' in capsys.readouterr().out
+        assert Review.objects.count() == 72
+
+    def test_02_bad_foreign_key(self, tmp_path):
+        shutil.copytree(SEED_DIR, tmp_path, dirs_exist_ok=True)
+        review = tmp_path / 'review.csv'
+        review.write_bytes(review.read_bytes().replace(
+            b'\r\n1,1,"', b'\r\n1,999,"', 1,
+        ))
+        with pytest.raises(CommandError, match='review.csv, строка 2'):
+            call_command('import_data', '--path', str(tmp_path))
+        assert Title.objects.count() == 32
+        assert not Review.objects.exists(), (
+            'Проверьте, что таблица с ошибкой загружается в транзакции.'
+        )
+
+    def test_03_new_ids_after_import(self, tmp_path):
+        call_command('import_data')
+        user = User.objects.create(username='new', email='new@yamdb.fake')
+        assert user.pk > 104
+
+    def test_04_invalid_options(self, tmp_path):
+        with pytest.raises(CommandError):
+            call_command('import_data', '--batch-size', '0')
+        with pytest.raises(CommandError, match='нет колонок'):
+            (tmp_path / 'users.csv').write_text('id,username\n1,a\n')
+            call_command('import_data', '--path', str(tmp_path))
@@ -0,0 +1,95 @@
+import json
+import shutil
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Review, Title
+
+SEED_DIR = settings.BASE_DIR / 'static/data'
+LAST_AUTHOR = b'",102,10,2019-09-24T21:08:21.567Z'
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    directory = tmp_path / 'data'
+    shutil.copytree(SEED_DIR, directory)
+    return directory
+
+
+def replace_last(path, old, new):
+    content = path.read_bytes()
+    index = content.rindex(old)
+    path.write_bytes(content[:index] + new + content[index + len(old):])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ImportResume:
+
+    def import_data(self, data_dir, checkpoint, *args):
+        call_command(
+            'import_data', '--path', str(data_dir),
+            '--checkpoint', str(checkpoint), '--batch-size', '10', *args,
+        )
+
+    def test_01_resume_after_error(self, data_dir, tmp_path):
+        checkpoint = tmp_path / 'import.json'
+        review = data_dir / 'review.csv'
+        replace_last(review, LAST_AUTHOR, LAST_AUTHOR.replace(b'102', b'999'))
+        with pytest.raises(CommandError, match='User с id 999'):
+            self.import_data(data_dir, checkpoint)
+        assert Review.objects.count() == 70, (
+            'Проверьте, что с --checkpoint пакеты до ошибки сохраняются.'
+        )
+        state = json.loads(checkpoint.read_text())
+        assert state['titles']['done'] is True
+        assert state['review'] == {
+            'offset': state['review']['offset'], 'line': state['review'][
+                'line'], 'rows': 70, 'done': False,
+        }
+
+        replace_last(review, LAST_AUTHOR.replace(b'102', b'999'),
+                     LAST_AUTHOR)
+        self.import_data(data_dir, checkpoint)
+        assert Review.objects.count() == 72, (
+            'Проверьте, что загрузка продолжается с сохранённого места.'
+        )
+        assert not checkpoint.exists(), (
+            'Проверьте, что файл состояния удаляется после загрузки.'
+        )
+        title = Title.objects.get(pk=13)
+        assert (title.review_count, title.score_sum) == (3, 11), (
+            'Проверьте, что рейтинги пересчитываются и после продолжения.'
+        )
+        assert Title.objects.get(pk=32).review_count == 1
+
+    def test_02_batch_saved_without_state(self, data_dir, tmp_path):
+        checkpoint = tmp_path / 'import.json'
+        replace_last(data_dir / 'review.csv', LAST_AUTHOR,
+                     LAST_AUTHOR.replace(b'102', b'999'))
+        with pytest.raises(CommandError):
+            self.import_data(data_dir, checkpoint)
+        state = json.loads(checkpoint.read_text())
+        state['review'].update(offset=40, line=2, rows=0)
+        checkpoint.write_text(json.dumps(state))
+
+        shutil.copy(SEED_DIR / 'review.csv', data_dir / 'review.csv')
+        self.import_data(data_dir, checkpoint)
+        assert Review.objects.count() == 72, (
+            'Проверьте, что уже записанные строки не загружаются повторно.'
+        )
+
+    def test_03_parallel_parsing(self, tmp_path, capsys):
+        checkpoint = tmp_path / 'import.json'
+        self.import_data(SEED_DIR, checkpoint, '--jobs', '2',
+                         '--verbosity', '2')
+        assert Review.objects.count() == 72
+        assert Review.objects.get(pk=6).text.count('\n') > 5, (
+            'Проверьте, что многострочные записи разбираются целиком.'
+        )
+        output = capsys.readouterr().out
+        assert 'review: 100%, 72 строк' in output, (
+            'Проверьте, что import_data печатает ход загрузки.'
+        )
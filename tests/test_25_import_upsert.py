@@ -0,0 +1,145 @@
+import csv
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title, TitleScoreCount
+from reviews.versions import get_versions
+from user.models import User
+
+
+def write_csv(path, header, rows):
+    with open(path, 'w', encoding='utf8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def delta_dir(tmp_path):
+    write_csv(tmp_path / 'users.csv', (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name',
+    ), (
+        (100, 'bingobongo', 'bingobongo@yamdb.fake', 'user', 'Новое био',
+         '', ''),
+        (101, 'capt_obvious', 'capt_obvious@yamdb.fake', 'admin', '', '',
+         ''),
+        (200, 'newcomer', 'newcomer@yamdb.fake', 'user', '', '', ''),
+    ))
+    write_csv(tmp_path / 'titles.csv', ('id', 'name', 'year', 'category'), (
+        (1, 'Побег из Шоушенка', 1994, 2),
+        (2, 'Крестный отец', 1972, 1),
+    ))
+    write_csv(tmp_path / 'review.csv', (
+        'id', 'title_id', 'text', 'author', 'score', 'pub_date',
+    ), (
+        (1, 1, 'Ставлю единицу', 100, 1, '2019-09-24T21:08:21.567Z'),
+        (500, 2, 'Новый отзыв', 200, 4, '2020-01-01T00:00:00.000Z'),
+    ))
+    return tmp_path
+
+
+def updates(context, table):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith(f'UPDATE "{table}"')
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ImportUpsert:
+
+    def upsert(self, path):
+        with CaptureQueriesContext(connection) as context:
+            call_command(
+                'import_data', '--path', str(path), '--mode', 'upsert',
+            )
+        return context
+
+    def test_01_upsert_delta(self, delta_dir, capsys):
+        call_command('import_data')
+        user = User.objects.get(pk=100)
+        user.set_password('secret')
+        user.save()
+        Title.objects.filter(pk=1).update(description='Описание')
+        title_before = Title.objects.get(pk=2)
+        versions = get_versions(('title', 'user'))
+        capsys.readouterr()
+
+        context = self.upsert(delta_dir)
+        output = capsys.readouterr().out
+        assert '(новых 1, изменено 1)' in output, (
+            'Проверьте, что upsert сообщает о новых и изменённых строках.'
+        )
+        assert 'Файла genre.csv нет' in output
+        assert len(updates(context, 'user_user')) == 1, (
+            'Проверьте, что изменившиеся строки обновляются одним '
+            'bulk_update, а неизменившиеся не обновляются.'
+        )
+
+        user = User.objects.get(pk=100)
+        assert user.bio == 'Новое био'
+        assert user.check_password('secret'), (
+            'Проверьте, что upsert не меняет поля, которых нет в CSV.'
+        )
+        assert User.objects.filter(pk=200).exists()
+        title = Title.objects.get(pk=1)
+        assert (title.category_id, title.description) == (2, 'Описание')
+
+        review = Review.objects.get(pk=1)
+        assert (review.score, review.text) == (1, 'Ставлю единицу')
+        title_2 = Title.objects.get(pk=2)
+        assert title_2.review_count == title_before.review_count + 1, (
+            'Проверьте, что после upsert пересчитываются рейтинги.'
+        )
+        assert title.score_sum == 11
+        assert TitleScoreCount.objects.get(title_id=1, score=1).count == 1
+        new_versions = get_versions(('title', 'user'))
+        assert all(
+            new_versions[key][0] > versions[key][0] for key in versions
+        ), 'Проверьте, что после upsert увеличиваются версии данных.'
+
+    def test_02_repeated_upsert_changes_nothing(self, delta_dir, capsys):
+        call_command('import_data')
+        self.upsert(delta_dir)
+        versions = get_versions(('title', 'user'))
+        capsys.readouterr()
+
+        context = self.upsert(delta_dir)
+        assert capsys.readouterr().out.count('(новых 0, изменено 0)') == 3
+        for table in ('user_user', 'reviews_title', 'reviews_review'):
+            assert not updates(context, table), (
+                'Проверьте, что upsert не обновляет неизменившиеся строки.'
+            )
+        assert get_versions(('title', 'user')) == versions
+
+    def test_03_upsert_into_empty_database(self):
+        self.upsert(settings.BASE_DIR / 'static/data')
+        assert Review.objects.count() == 72
+        assert Title.objects.get(pk=13).review_count == 3
+
+    def test_04_rename_changes_review_list_etag(self, client, tmp_path):
+        call_command('import_data')
+        url = '/api/v1/titles/1/reviews/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert response.json()['results'][0]['title'] == 'Побег из Шоушенка'
+
+        write_csv(
+            tmp_path / 'titles.csv', ('id', 'name', 'year', 'category'),
+            ((1, 'Зелёная миля', 1994, 1),),
+        )
+        self.upsert(tmp_path)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что после upsert, переименовавшего произведение, '
+            'ETag списка его отзывов меняется.'
+        )
+        assert response['ETag'] != etag
+        assert response.json()['results'][0]['title'] == 'Зелёная миля', (
+            'Проверьте, что анонимный кеш списка отзывов не отдаёт '
+            'старое название после upsert.'
+        )
@@ -0,0 +1,115 @@
+import shutil
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Genre, Review
+from user.models import User
+
+SEED_DIR = settings.BASE_DIR / 'static/data'
+
+
+def edit(path, old, new):
+    content = path.read_bytes()
+    assert old in content
+    path.write_bytes(content.replace(old, new, 1))
+
+
+@pytest.fixture
+def broken_dir(tmp_path):
+    shutil.copytree(SEED_DIR, tmp_path, dirs_exist_ok=True)
+    edit(tmp_path / 'review.csv', b'",102,10,2019-09-24T21:08:21.567Z',
+         b'",999,10,2019-09-24T21:08:21.567Z')
+    edit(tmp_path / 'titles.csv', b',1739,3', b',3000,3')
+    edit(tmp_path / 'genre.csv', b'2,\xd0\x9a', b'1,\xd0\x9a')
+    edit(tmp_path / 'genre.csv', b'drama', b'bad slug!')
+    edit(tmp_path / 'genre_title.csv', b'\n2,2,1', b'\n2,2,77')
+    edit(tmp_path / 'comments.csv', b'\n1,6,', b'\n1,600,')
+    return tmp_path
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ImportValidate:
+
+    def validate(self, path):
+        call_command('import_data', '--path', str(path), '--validate-only')
+
+    def test_01_seed_is_valid(self, capsys):
+        self.validate(SEED_DIR)
+        assert 'ошибок нет' in capsys.readouterr().out
+        assert not User.objects.exists(), (
+            'Проверьте, что --validate-only ничего не загружает.'
+        )
+
+    def test_02_report(self, broken_dir, capsys):
+        with pytest.raises(CommandError, match='Найдено ошибок: 6'):
+            self.validate(broken_dir)
+        report = capsys.readouterr().out
+        for line in (
+            'review.csv, author: нет в user_user — 1 строк '
+            '(записи 3; значения 999)',
+            'titles.csv, year: Некоректный год. — 1 строк '
+            '(записи 32; значения 3000)',
+            'genre.csv, id: повторяется — 2 строк (записи 1, 2; '
+            'значения 1)',
+            'genre.csv, slug: ',
+            'genre_title.csv, genre_id: нет в reviews_genre — 6 строк '
+            '(записи 2, 5, 12, 21, 24; значения 2, 77)',
+            'comments.csv, review_id: нет в reviews_review — 1 строк',
+        ):
+            assert line in report, (
+                f'Проверьте, что отчёт --validate-only содержит `{line}`.'
+            )
+        assert not Genre.objects.exists()
+
+    def test_03_scores_and_references_to_database(self, tmp_path, capsys):
+        call_command('import_data')
+        capsys.readouterr()
+        (tmp_path / 'review.csv').write_text(
+            'id,title_id,text,author,score,pub_date\n'
+            '500,1,Текст,101,11,2020-01-01T00:00:00.000Z\n'
+            '501,1,Текст,101,0,вчера\n'
+            '502,1,Текст,101,5\n',
+            encoding='utf8',
+        )
+        with pytest.raises(CommandError):
+            self.validate(tmp_path)
+        report = capsys.readouterr().out
+        assert 'review.csv, score: ' in report
+        assert 'review.csv, pub_date: ' in report
+        assert 'review.csv: неверное число колонок — 1 строк (записи 3)' in (
+            report
+        )
+        assert 'review.csv, title_id: ' not in report, (
+            'Проверьте, что внешние ключи ищутся и среди загруженных строк.'
+        )
+        assert 'review.csv, author: ' not in report, (
+            'Проверьте, что внешние ключи ищутся и среди загруженных строк.'
+        )
+        assert 'title_id+author: сочетание повторяется' in report
+        assert Review.objects.count() == 72
+
+    def test_04_numbers_after_broken_rows(self, tmp_path, capsys):
+        (tmp_path / 'category.csv').write_text(
+            'id,name,slug\n'
+            '1,Фильм,movie\n'
+            '2,Книга\n'
+            '\n'
+            '3,Музыка,bad slug!\n'
+            '1,Песня,song\n',
+            encoding='utf8',
+        )
+        with pytest.raises(CommandError):
+            self.validate(tmp_path)
+        report = capsys.readouterr().out
+        assert 'category.csv: неверное число колонок — 1 строк (записи 2)' \
+            in report
+        assert 'category.csv, slug: ' in report
+        assert '1 строк (записи 4; значения bad slug!)' in report, (
+            'Проверьте, что после записей с неверным числом колонок '
+            'отчёт указывает настоящие номера записей.'
+        )
+        assert 'category.csv, id: повторяется — 2 строк (записи 1, 5; ' \
+            'значения 1)' in report
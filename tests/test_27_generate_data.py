@@ -0,0 +1,123 @@
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, Sum
+
+from reviews.models import (Comments, GenreTitle, Review, Title,
+                            TitleLeaderboard, TitleScoreCount)
+from reviews.search import search_enabled, search_titles
+from reviews.versions import get_versions
+from user.models import User
+
+OPTIONS = (
+    '--users', '50', '--titles', '20', '--genres', '5', '--categories', '3',
+    '--reviews', '300', '--comments', '1', '--batch-size', '40',
+)
+
+
+def generate(*args):
+    call_command('generate_data', *OPTIONS, *args)
+
+
+def read_files(directory):
+    return {
+        path.name: path.read_bytes() for path in sorted(directory.iterdir())
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27GenerateData:
+
+    def test_01_csv_is_deterministic(self, tmp_path):
+        for name in ('first', 'second'):
+            generate('--output', 'csv', '--path', str(tmp_path / name))
+        first = read_files(tmp_path / 'first')
+        assert first == read_files(tmp_path / 'second'), (
+            'Проверьте, что generate_data с тем же --seed пишет те же файлы.'
+        )
+        assert len(first) == 7
+        assert first['review.csv'].count(b'\n') == 301
+
+        generate('--output', 'csv', '--path', str(tmp_path / 'other'),
+                 '--seed', '1')
+        assert read_files(tmp_path / 'other') != first
+
+        generate('--output', 'csv', '--path', str(tmp_path / 'comments'),
+                 '--comments', '3')
+        assert read_files(tmp_path / 'comments')['review.csv'] == (
+            first['review.csv']
+        ), 'Проверьте, что у каждой таблицы свой генератор случайных чисел.'
+
+    def test_02_csv_is_importable(self, tmp_path, capsys):
+        generate('--output', 'csv', '--path', str(tmp_path))
+        call_command('import_data', '--path', str(tmp_path),
+                     '--validate-only')
+        assert 'ошибок нет' in capsys.readouterr().out, (
+            'Проверьте, что файлы generate_data проходят проверку '
+            'import_data.'
+        )
+        call_command('import_data', '--path', str(tmp_path))
+        assert Review.objects.count() == 300
+        assert User.objects.filter(role='admin').exists()
+
+    def test_03_database_output(self, tmp_path, capsys):
+        generate()
+        assert 'Сгенерировано строк' in capsys.readouterr().out
+        assert (User.objects.count(), Title.objects.count()) == (50, 20)
+        assert Review.objects.count() == 300
+        assert GenreTitle.objects.count() >= 20
+        counts = sorted(
+            Review.objects.order_by().values('title')
+            .annotate(count=Count('id'))
+            .values_list('count', flat=True),
+            reverse=True,
+        )
+        assert counts[0] == 50 and counts[0] > 5 * counts[-1], (
+            'Проверьте, что число отзывов на произведение распределено '
+            'по закону Ципфа.'
+        )
+
+        for title in Title.objects.all():
+            reviews = title.reviews.aggregate(
+                count=Count('id'), total=Sum('score'),
+            )
+            assert title.review_count == reviews['count'], (
+                'Проверьте, что после генерации пересчитываются рейтинги.'
+            )
+            assert title.score_sum == (reviews['total'] or 0)
+        assert TitleScoreCount.objects.exists()
+        assert TitleLeaderboard.objects.filter(
+            genre=None, category=None,
+        ).count() == Title.objects.filter(
+            review_count__gte=settings.LEADERBOARD_MIN_REVIEWS,
+        ).count()
+        comment_counts = Review.objects.filter(comment_count__gt=0)
+        assert comment_counts.aggregate(
+            total=Sum('comment_count'),
+        )['total'] == Comments.objects.count() > 0
+        assert len(get_versions(('title', 'user', 'genre', 'category'))) == 4
+        if search_enabled():
+            name = Title.objects.first().name
+            assert search_titles(Title.objects.all(), name).exists(), (
+                'Проверьте, что сгенерированные произведения есть '
+                'в поисковом индексе.'
+            )
+
+        generate('--output', 'csv', '--path', str(tmp_path / 'csv'))
+        call_command('export_data', '--path', str(tmp_path / 'export'))
+        assert read_files(tmp_path / 'csv') == read_files(
+            tmp_path / 'export',
+        ), 'Проверьте, что в БД и в CSV генерируются одни и те же строки.'
+
+        with pytest.raises(CommandError, match='уже есть данные'):
+            generate()
+
+    def test_04_invalid_options(self, tmp_path):
+        with pytest.raises(CommandError, match='--path'):
+            generate('--output', 'csv')
+        with pytest.raises(CommandError, match='не помещаются'):
+            generate('--reviews', '5000')
+        with pytest.raises(CommandError):
+            generate('--users', '0')
+        assert not User.objects.exists()
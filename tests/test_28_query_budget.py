@@ -0,0 +1,149 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+
+from api.queries import QueryBudgetExceeded, query_budget_exceeded, query_shape
+from api.views import CategoryViewSet, ReviewViewSet
+from reviews.models import Category, Review, Title
+
+
+@pytest.fixture
+def title_reviews(admin, user, moderator, user_superuser):
+    title = Title.objects.create(name='Произведение', year=2000)
+    for author in (admin, user, moderator, user_superuser):
+        Review.objects.create(author=author, title=title, text='Отзыв',
+                              score=5)
+    return title
+
+
+def reviews_n_plus_one(self):
+    self.title = self.title_get_or_404()
+    return self.title.reviews.all()
+
+
+@pytest.fixture
+def received():
+    calls = []
+
+    def receiver(sender, **kwargs):
+        calls.append((sender, kwargs))
+
+    query_budget_exceeded.connect(receiver)
+    yield calls
+    query_budget_exceeded.disconnect(receiver)
+
+
+def test_query_shape():
+    assert query_shape(
+        "SELECT * FROM user WHERE id = 15 AND name = 'it''s' LIMIT 21"
+    ) == query_shape(
+        "SELECT * FROM user WHERE id = 7 AND name = 'x' LIMIT 21"
+    ), 'Проверьте, что форма запроса не зависит от значений.'
+    assert query_shape('SELECT 1 WHERE id IN (%s, %s, %s)') == (
+        'SELECT ? WHERE id IN (...)'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28QueryBudget:
+
+    def test_01_budget_exceeded(self, admin_client, monkeypatch):
+        Category.objects.create(name='Книги', slug='books')
+        monkeypatch.setattr(CategoryViewSet, 'query_budget', {'list': 1})
+        with pytest.raises(QueryBudgetExceeded, match='бюджет 1'):
+            admin_client.get('/api/v1/categories/')
+        monkeypatch.setattr(CategoryViewSet, 'query_budget', 1)
+        with pytest.raises(QueryBudgetExceeded):
+            admin_client.get('/api/v1/categories/')
+        monkeypatch.setattr(CategoryViewSet, 'query_budget', {'create': 1})
+        response = admin_client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что без бюджета действия число запросов '
+            'не ограничено.'
+        )
+
+    def test_02_reviews_without_n_plus_one(self, admin_client, title_reviews,
+                                           monkeypatch):
+        monkeypatch.setattr(ReviewViewSet, 'values_list_enabled', False)
+        url = f'/api/v1/titles/{title_reviews.id}/reviews/'
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что отзывы читаются вместе с авторами '
+            'и произведениями.'
+        )
+        assert len(response.json()['results']) == 4
+
+        monkeypatch.setattr(ReviewViewSet, 'get_queryset', reviews_n_plus_one)
+        with pytest.raises(QueryBudgetExceeded,
+                           match='раз: SELECT "user_user"'):
+            admin_client.get(url)
+
+    def test_03_log_and_metric(self, admin_client, title_reviews, settings,
+                               monkeypatch, received, caplog):
+        monkeypatch.setattr(ReviewViewSet, 'values_list_enabled', False)
+        monkeypatch.setattr(ReviewViewSet, 'get_queryset', reviews_n_plus_one)
+        url = f'/api/v1/titles/{title_reviews.id}/reviews/'
+
+        settings.QUERY_BUDGET_MODE = 'log'
+        with caplog.at_level(logging.WARNING, logger='api.queries'):
+            assert admin_client.get(url).status_code == HTTPStatus.OK
+        assert 'раз: SELECT' in caplog.text, (
+            'Проверьте, что в режиме log нарушение пишется в лог.'
+        )
+        caplog.clear()
+
+        settings.QUERY_BUDGET_MODE = 'metric'
+        assert admin_client.get(url).status_code == HTTPStatus.OK
+        assert not caplog.text
+        assert len(received) == 2, (
+            'Проверьте, что сигнал query_budget_exceeded отправляется '
+            'в каждом режиме.'
+        )
+        sender, kwargs = received[-1]
+        assert sender is ReviewViewSet
+        assert kwargs['budget'] == ReviewViewSet.query_budget['list']
+        # Четыре автора отзывов и пользователь из токена.
+        assert list(kwargs['repeated'].values()) == [5]
+
+    def test_04_failed_request_keeps_error(self, admin_client, monkeypatch,
+                                           received):
+        for number in range(5):
+            Category.objects.create(name=f'Категория {number}',
+                                    slug=f'category-{number}')
+
+        def failing_list(self, request, *args, **kwargs):
+            for category in Category.objects.all():
+                Category.objects.get(pk=category.pk)
+            raise RuntimeError('Ошибка view')
+
+        monkeypatch.setattr(CategoryViewSet, 'list', failing_list)
+        with pytest.raises(RuntimeError, match='Ошибка view'):
+            admin_client.get('/api/v1/categories/')
+        admin_client.raise_request_exception = False
+        response = admin_client.get('/api/v1/categories/')
+        assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
+        assert not received, (
+            'Проверьте, что запросы, завершившиеся ошибкой, не проверяются '
+            'бюджетом и исходная ошибка не подменяется.'
+        )
+
+    def test_05_non_api_views_not_checked(self, client, user_superuser,
+                                          django_user_model, received):
+        title = Title.objects.create(name='Произведение', year=2000)
+        for number in range(6):
+            author = django_user_model.objects.create(
+                username=f'author{number}', email=f'author{number}@yamdb.fake',
+            )
+            Review.objects.create(author=author, title=title, text='Отзыв',
+                                  score=5)
+        client.force_login(user_superuser)
+        response = client.post(
+            f'/admin/reviews/title/{title.id}/delete/', {'post': 'yes'},
+        )
+        assert response.status_code == HTTPStatus.FOUND, (
+            'Проверьте, что view без query_budget, например админка, '
+            'не проверяются на N+1.'
+        )
+        assert not Title.objects.filter(pk=title.id).exists()
+        assert not received
@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.management.commands import recompute_ratings
+from reviews.models import Review, Title, TitleScoreCount
+
+
+def snapshot():
+    return (
+        list(Title.objects.order_by('id').values_list(
+            'id', 'score_sum', 'review_count', 'rating',
+        )),
+        list(TitleScoreCount.objects.order_by(
+            'title_id', 'score',
+        ).values_list('title_id', 'score', 'count')),
+        list(Review.objects.order_by('id').values_list(
+            'id', 'comment_count',
+        )),
+    )
+
+
+def inject_drift():
+    Title.objects.filter(pk__in=(1, 20)).update(
+        score_sum=5, review_count=99, rating=1,
+    )
+    TitleScoreCount.objects.filter(title_id=20).delete()
+    Review.objects.filter(pk=1).update(comment_count=42)
+
+
+@pytest.fixture
+def expected():
+    call_command('import_data', stdout=None)
+    state = snapshot()
+    inject_drift()
+    return state
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29RecomputeRatings:
+
+    def recompute(self, capsys, *args):
+        capsys.readouterr()
+        call_command('recompute_ratings', *args)
+        return capsys.readouterr().out
+
+    def test_01_fixes_drift(self, expected, capsys):
+        output = self.recompute(capsys, '--chunk-size', '7')
+        assert 'Проверено произведений: 32, разошлось с отзывами: 2, ' \
+            'отзывов с неверным числом комментариев: 1' in output
+        assert snapshot() == expected, (
+            'Проверьте, что recompute_ratings исправляет рейтинги, '
+            'гистограммы оценок и счётчики комментариев.'
+        )
+        output = self.recompute(capsys)
+        assert 'разошлось с отзывами: 0' in output
+
+    def test_02_dry_run(self, expected, capsys):
+        drifted = snapshot()
+        output = self.recompute(capsys, '--dry-run')
+        assert 'разошлось с отзывами: 2' in output
+        assert '(не исправлено)' in output
+        assert snapshot() == drifted, (
+            'Проверьте, что с --dry-run recompute_ratings ничего не меняет.'
+        )
+
+    def test_03_workers(self, expected, capsys, monkeypatch):
+        # Тестовая БД SQLite находится в памяти процесса и не выдерживает
+        # параллельной записи из потоков: пул заменяется одним потоком,
+        # проверяется раздача диапазонов и сбор результатов.
+        def pool(workers, initializer):
+            return ThreadPoolExecutor(1, initializer=initializer)
+
+        monkeypatch.setattr(recompute_ratings, 'ProcessPoolExecutor', pool)
+        output = self.recompute(
+            capsys, '--workers', '3', '--chunk-size', '5',
+        )
+        assert 'разошлось с отзывами: 2' in output
+        assert snapshot() == expected, (
+            'Проверьте, что с --workers результат тот же.'
+        )
+
+    def test_04_checkpoint(self, expected, capsys, tmp_path):
+        checkpoint = tmp_path / 'recompute.txt'
+        checkpoint.write_text('1 11\n')
+        output = self.recompute(
+            capsys, '--checkpoint', str(checkpoint), '--chunk-size', '5',
+        )
+        assert 'Пропущено уже обработанных диапазонов: 2' in output
+        assert Title.objects.get(pk=1).review_count == 99, (
+            'Проверьте, что диапазоны из --checkpoint не пересчитываются.'
+        )
+        assert Title.objects.get(pk=20).review_count != 99
+        assert not checkpoint.exists(), (
+            'Проверьте, что файл состояния удаляется после пересчёта.'
+        )
+
+        checkpoint.write_text('1 4\n')
+        self.recompute(
+            capsys, '--checkpoint', str(checkpoint), '--chunk-size', '5',
+        )
+        assert snapshot() == expected, (
+            'Проверьте, что диапазон, обработанный с другим --chunk-size '
+            'лишь частично, пересчитывается.'
+        )
+
+        checkpoint.write_text('1\n')
+        with pytest.raises(CommandError, match='файл состояния'):
+            self.recompute(capsys, '--checkpoint', str(checkpoint))
+
+    def test_05_chunk_is_atomic(self, expected, capsys, monkeypatch):
+        drifted = snapshot()
+
+        def failing_rebuild(title_ids):
+            raise RuntimeError('Сбой пересчёта')
+
+        monkeypatch.setattr(
+            recompute_ratings, 'rebuild_leaderboards', failing_rebuild,
+        )
+        with pytest.raises(RuntimeError, match='Сбой пересчёта'):
+            self.recompute(capsys)
+        assert snapshot() == drifted, (
+            'Проверьте, что диапазон пересчитывается в одной транзакции: '
+            'от чтения отзывов до записи агрегатов.'
+        )